@@ -2,13 +2,26 @@ from micropython import const
 
 LORA_ADDR = const(11)
 
-COMMANDS = {
-    "help": "Display available commands",
-    "ping": "Send a ping to the satellite",
-    "reboot": "Command the satellite to reboot",
-    "status": "Request status from the satellite",
-    "sensors": "Request sensor data from the satellite",
-    "tx-power": "Set the LoRa TX power (5-23 dBm)",
-    "heartbeat": "Toggle automatic heartbeat messages",
-    "quit": "Exit the command processor"
-}
\ No newline at end of file
+# Serial console commands and their help text, kept as parallel tuples
+# so a frozen build leaves the strings in flash rather than a heap dict
+COMMAND_NAMES = (
+    "help",
+    "ping",
+    "reboot",
+    "status",
+    "sensors",
+    "tx-power",
+    "heartbeat",
+    "quit",
+)
+
+COMMAND_HELP = (
+    "Display available commands",
+    "Send a ping to the satellite",
+    "Command the satellite to reboot",
+    "Request status from the satellite",
+    "Request sensor data from the satellite",
+    "Set the LoRa TX power (5-23 dBm)",
+    "Toggle automatic heartbeat messages",
+    "Exit the command processor",
+)
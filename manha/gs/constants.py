@@ -11,6 +11,13 @@ LORA_MISO = const(12)
 LORA_CS = const(13)
 LORA_RESET = const(7)
 TRANSMIT_INTERVAL = const(1.0)
+CMD_MAX_LEN = const(64)  # Longest command built in the reusable TX buffer
+GC_MIN_FREE = const(8192)  # Collect in the heartbeat loop below this many free bytes
+MULTIPART_TIMEOUT_MS = const(30000)  # Drop a partial multipart message after this long without a new part
+# Partial multipart messages are bounded to MULTIPART_MAX_SENDERS messages
+# of at most MULTIPART_MAX_PARTS radio frames each
+MULTIPART_MAX_SENDERS = const(4)  # Partial multipart messages held at once
+MULTIPART_MAX_PARTS = const(16)  # Most parts accepted for one multipart message
 GS_SSID = "MANHA_GS"
 GS_PASS = "ground1234"
 
@@ -10,17 +10,31 @@ import time
 import asyncio
 import gc
 import sys
-import select  # Add select module for stdin handling
+import select  # Poll stdin for console input
 from micropython import const
 gc.collect()
 from .lora import LoRa
+from manha.utils import collect_if_low
 import network
 from manha.internals.microdot import Microdot, send_file, websocket 
-import json  # Import json module for data serialization
 
 from manha.config import *
 from .constants import *
 
+# Console echo sequences, written directly instead of being rebuilt per keystroke
+_BACKSPACE = "\b \b"  # Move cursor back, clear character, move cursor back again
+_NEWLINE = "\n"
+_CMD_MAX = const(128)  # Longest console command line, in bytes
+_DEBUG_TRACEBACK = const(0)  # Print full tracebacks for init errors
+_WS_BACKLOG = const(16)  # Payloads kept per websocket client between sends
+
+# Console help, built once at import rather than on every `help`
+_HELP_TEXT = (
+    "\nAvailable Commands:\n------------------\n"
+    + "\n".join(f"{name:<12} - {desc}" for name, desc in zip(COMMAND_NAMES, COMMAND_HELP))
+    + "\nCommand Format: command [arguments]\nExample: tx-power 15\n"
+)
+
 class ManhaGS:
     """
     MANHA Ground Station class for LoRa communication with MANHA satellite.
@@ -35,9 +49,6 @@ class ManhaGS:
             lora_address_to (int): LoRa address to send data to (satellite)
             lora_address_from (int): LoRa address of this device (ground station)
         """
-        # Run garbage collection before initialization
-        gc.collect()
-
         self.ws_clients = 0
         
         # Configuration
@@ -47,14 +58,30 @@ class ManhaGS:
         # Current data to transmit periodically
         self.sequence = 0
         
-        # Create a mutex for received data protection
-        self.data_lock = asyncio.Lock()
-        self.received_data = {}
+        # Latest replies from the satellite. Only the LoRa receiver task
+        # writes here and a single dict store cannot be interleaved with
+        # another task, so no lock is needed. Every key is created up front
+        # so updates overwrite a slot instead of growing the dict
+        self.received_data = {
+            "telemetry": None,
+            "command_response": None,
+        }
         self.last_received_data = None 
+        # One [pending payloads, wakeup event] pair per connected /live client
+        self._ws_feeds = []
         
         # Command system settings
-        self.heartbeat_enabled = False
-        self.command_buffer = ""
+        # Set while heartbeats are enabled, so the idle heartbeat task
+        # blocks on it instead of waking every interval
+        self._heartbeat_event = asyncio.Event()
+        # Console line buffer, filled in place up to _cmd_len
+        self._cmd_buf = bytearray(_CMD_MAX)
+        self._cmd_len = 0
+        
+        # Register stdin with a poll object once instead of building
+        # select() argument lists on every console check
+        self._stdin_poll = select.poll()
+        self._stdin_poll.register(sys.stdin, select.POLLIN)
         
         # Set up command system
         self.commands = {}
@@ -70,7 +97,7 @@ class ManhaGS:
 
         try:
             # Initialize SPI for LoRa communication
-            spi = SPI(LORA_SPI_CHANNEL, baudrate=5_000_000, polarity=0, phase=0, 
+            spi = SPI(LORA_SPI_CHANNEL, baudrate=10_000_000, polarity=0, phase=0, firstbit=SPI.MSB,
                      miso=Pin(LORA_MISO), mosi=Pin(LORA_MOSI), sck=Pin(LORA_SCK))
             cs_pin = Pin(LORA_CS, Pin.OUT)
             reset_pin = Pin(LORA_RESET, Pin.OUT)
@@ -90,13 +117,11 @@ class ManhaGS:
             self.lora.set_callback(CALLBACK_TELEMETRY, self.handle_telemetry_data)
             self.lora.set_callback(CALLBACK_COMMAND_RESPONSE, self.handle_command_response)
             
-            
-            # Run garbage collection after LoRa setup
-            gc.collect()
-            
         except Exception as e:
-            import sys
-            sys.print_exception(e)  # Print the full exception details including traceback
+            if _DEBUG_TRACEBACK:
+                sys.print_exception(e)  # Print the full exception details including traceback
+            else:
+                print("LoRa init error:", repr(e))
             # Set lora to None to allow the system to continue without LoRa
             self.lora = None
         
@@ -108,8 +133,14 @@ class ManhaGS:
  
 
 
-        # Run garbage collection after initialization
+        # Run garbage collection once after initialization, then let the runtime
+        # collect on its own once another quarter of the free heap is allocated
         gc.collect()
+        gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+        # Ports that support it can move the long-lived init objects out of
+        # the scanned heap so later collections only walk runtime allocations
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
         
         # Print welcome message
         self.print_welcome()
@@ -126,7 +157,6 @@ class ManhaGS:
         self.led.on()
         
         self.ip = self.ap.ifconfig()[0]
-        gc.collect()  # Run garbage collection after network setup
     
     def _setup_routes(self):
         """Set up the web server routes"""
@@ -141,15 +171,28 @@ class ManhaGS:
         @self.app.route('/live')
         @websocket.with_websocket
         async def live_socket(request, ws):
+                # Start with the latest payload so a new client has data at once
+                pending = [] if self.last_received_data is None else [self.last_received_data]
+                ready = asyncio.Event()
+                if pending:
+                    ready.set()
+                feed = [pending, ready]
                 try:
                     self.ws_clients += 1
+                    self._ws_feeds.append(feed)
                     while True:
-                        if self.last_received_data is not None:
-                            await ws.send(self.last_received_data)
-                            await asyncio.sleep(1)  # Allow some time for the client to process    
+                        # Sleep until _publish() queues something, then send
+                        # everything that piled up, one message per payload
+                        await ready.wait()
+                        ready.clear()
+                        batch = feed[0]
+                        feed[0] = []
+                        for payload in batch:
+                            await ws.send(payload)
                 except Exception as e:
                     pass
                 finally:
+                    self._ws_feeds.remove(feed)
                     try:
                         await ws.close()
                     except:
@@ -177,6 +220,34 @@ class ManhaGS:
                 return {'success': True}, 200
 
 
+    @property
+    def heartbeat_enabled(self):
+        """Whether periodic PING heartbeats are being sent"""
+        return self._heartbeat_event.is_set()
+    
+    @heartbeat_enabled.setter
+    def heartbeat_enabled(self, enabled):
+        if enabled:
+            self._heartbeat_event.set()
+        else:
+            self._heartbeat_event.clear()
+    
+    def _publish(self, payload):
+        """
+        Store the latest payload and queue it for every /live client
+        
+        Args:
+            payload (str): JSON text to forward to websocket clients
+        """
+        self.last_received_data = payload
+        for feed in self._ws_feeds:
+            pending = feed[0]
+            # Drop the oldest payload if a slow client has fallen behind
+            if len(pending) >= _WS_BACKLOG:
+                pending.pop(0)
+            pending.append(payload)
+            feed[1].set()
+    
     def print_welcome(self):
         """Print the welcome message and command instructions"""
         pass
@@ -191,30 +262,43 @@ class ManhaGS:
             message (str): Unused (kept for compatibility)
             interval (float): The time interval between transmissions in seconds.
         """
+        # The radio and target address are fixed after __init__, bind the
+        # per-iteration lookups once. _run() only starts this task when the
+        # radio initialized, so self.lora is set
+        lora = self.lora
+        send_encoded = lora.send_encoded
+        # The PING packet never changes, so encode it and its checksum once
+        ping = lora.encode_command("PING", self.lora_address_to)
+        sleep = asyncio.sleep
+        interval_ms = int(interval * 1000)
+        ticks_ms = time.ticks_ms
+        ticks_diff = time.ticks_diff
+        enabled = self._heartbeat_event.wait
         
         while True:
             try:
-                # Skip transmission if LoRa is not initialized or heartbeats are disabled
-                if self.lora is None or not self.heartbeat_enabled:
-                    await asyncio.sleep(interval)
-                    continue
-                    
+                # Sleep until heartbeats are switched on
+                await enabled()
+                t0 = ticks_ms()
+                
                 # Send PING command to maintain connection
-                result = await self.lora.send_command("PING", self.lora_address_to)
+                result = await send_encoded(ping)
                 
                 if not result:
                     print("Failed to send PING")
                     
                 self.sequence += 1
                 
-                # Run garbage collection after sending
-                gc.collect()
+                # Only force a collection when the heap is actually running low
+                collect_if_low(GC_MIN_FREE)
                 
-                # Wait for next transmission cycle
-                await asyncio.sleep(interval)
+                # Wait out the rest of the cycle so the PING cadence does not
+                # drift by the time spent transmitting
+                dt = ticks_diff(ticks_ms(), t0)
+                await asyncio.sleep_ms(interval_ms - dt if dt < interval_ms else 0)
                 
             except Exception as e:
-                await asyncio.sleep(1)
+                await sleep(1)
 
     async def send_command(self, command):
         """
@@ -246,33 +330,72 @@ class ManhaGS:
         the satellite via LoRa.
         """
         
+        stdin_poll = self._stdin_poll.poll
+        read = sys.stdin.read
+        console_char = self._console_char
+        
+        # Park the task until stdin is readable instead of waking to poll it.
+        # Wrapping stdin always succeeds, a port that cannot stream it only
+        # fails on the first read, which switches the task to polling
+        wait_char = asyncio.StreamReader(sys.stdin).read
+        
         while True:
-            # Check if there's data available on stdin
-            if sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
-                char = sys.stdin.read(1)
-                
-                # Process backspace
-                if char == '\b' or char == '\x7f':  # Backspace or Delete
-                    if self.command_buffer:
-                        self.command_buffer = self.command_buffer[:-1]
-                        # Move cursor back, clear character, move cursor back again
-                        sys.stdout.write('\b \b')
-                # Process enter key
-                elif char == '\n' or char == '\r':
-                    sys.stdout.write('\n')
-                    # Process the command if buffer is not empty
-                    if self.command_buffer:
-                        await self.process_command(self.command_buffer)
-                        self.command_buffer = ""
-                    # Print new prompt
-                # Add other characters to buffer
-                else:
-                    # Echo the character
-                    sys.stdout.write(char)
-                    self.command_buffer += char
+            if wait_char is not None:
+                try:
+                    char = await wait_char(1)
+                except Exception:
+                    wait_char = None
+                    continue
+            else:
+                while not stdin_poll(0):
+                    await asyncio.sleep(0.05)
+                char = read(1)
+            
+            # Drain everything already waiting on stdin so pasted commands
+            # are handled in one wake instead of one character per tick
+            while True:
+                command = console_char(char)
+                if command:
+                    await self.process_command(command)
+                if not stdin_poll(0):
+                    break
+                char = read(1)
             
             # Yield to other tasks
-            await asyncio.sleep(0.05)
+            await asyncio.sleep(0)
+    
+    def _console_char(self, char):
+        """
+        Apply one console character to the line buffer and echo it
+        
+        Args:
+            char (str): Character read from stdin
+            
+        Returns:
+            str: The completed command line on Enter, otherwise None
+        """
+        write = sys.stdout.write
+        
+        # Process backspace
+        if char == '\b' or char == '\x7f':  # Backspace or Delete
+            if self._cmd_len:
+                self._cmd_len -= 1
+                write(_BACKSPACE)
+        # Process enter key
+        elif char == '\n' or char == '\r':
+            write(_NEWLINE)
+            # Hand back the command if buffer is not empty
+            if self._cmd_len:
+                command = self._cmd_buf[:self._cmd_len].decode()
+                self._cmd_len = 0
+                return command
+        # Add other printable characters to buffer while it has room
+        elif self._cmd_len < _CMD_MAX and ' ' <= char <= '~':
+            # Echo the character
+            write(char)
+            self._cmd_buf[self._cmd_len] = ord(char)
+            self._cmd_len += 1
+        return None
     
     async def process_command(self, command_str):
         """
@@ -308,71 +431,7 @@ class ManhaGS:
     
     def show_help(self):
         """Display help information for available commands"""
-        pass
-    
-
-    def handle_received_data(self):
-        """
-        Process data received from the satellite
-        
-        Args:
-            message (str): The message received from the satellite
-            from_address (int): The address of the sender
-        """
-
-        async def handle_recv(packet):
-
-            from_address = packet.sender_id
-            message = packet.message
-
-
-            # log to file
-            with open("received_data.log", "a") as log_file:
-                log_file.write(f"{time.time()}: {message}\n")
-            
-            # Only process messages from the satellite address
-            if from_address != self.lora_address_to:
-                return
-                
-            if message.startswith("STATUS:"):
-                # Handle status response
-                status_data = message[7:].strip()
-                async with self.data_lock:
-                    self.received_data["status"] = status_data
-            
-            elif message.startswith("SENSORS:"):
-                # Handle sensor data
-                sensor_data = message[8:].strip()
-                async with self.data_lock:
-                    self.received_data["sensors"] = sensor_data
-                
-            elif message.startswith("PING:"):
-                # Handle ping response
-                ping_data = message[5:].strip()
-                
-            elif message.startswith("ACK:"):
-                # Handle command acknowledgment
-                ack_data = message[4:].strip()
-                
-            elif message.startswith("ERR:"):
-                # Handle error response
-                err_data = message[4:].strip()
-                
-            else:
-                # Try to parse as JSON and print only JSON data with \r\n separation
-                try:
-                    # Attempt to parse as JSON to validate it's a valid JSON packet
-                    json.loads(message.decode('utf-8'))
-                    # If successful, print the JSON with \r\n
-                    print(message.decode('utf-8') + '\r\n')
-                    self.last_received_data = message.decode('utf-8')  # Store raw message
-                except Exception as e:
-                    # Not a valid JSON packet, store but don't print
-                    self.last_received_data = message.decode('utf-8')
-                    print(self.last_received_data)
-                
-            
-        return handle_recv
+        print(_HELP_TEXT)
     
     async def handle_telemetry_data(self, data: dict, packet):
         """Handle received telemetry data"""
@@ -381,14 +440,14 @@ class ManhaGS:
                 return
             
             # Store the received data
-            async with self.data_lock:
-                self.received_data["telemetry"] = data
+            self.received_data["telemetry"] = data
             
             # Update last received data for websocket clients
-            self.last_received_data = json.dumps(data)
+            # Forward the JSON text as received rather than re-serializing the dict
+            self._publish(self.lora.get_last_telemetry_json())
             
             # Print telemetry data
-            print(f"TLM:{data}")
+            print("TLM:", data, sep="")
             
         except Exception as e:
             print(f"TLM handling error: {e}")
@@ -399,8 +458,7 @@ class ManhaGS:
             if packet.addr_to != self.lora_address_to:
                 return
             # Store response data
-            async with self.data_lock:
-                self.received_data["command_response"] = response
+            self.received_data["command_response"] = response
                 
         except Exception as e:
             print(f"Command response handling error: {e}")
@@ -425,28 +483,45 @@ class ManhaGS:
         except Exception as e:
             pass
     
+    async def _supervise(self, name, start):
+        """
+        Run a long-lived coroutine, reporting and restarting it if it ends
+        
+        Args:
+            name (str): Name printed when the coroutine stops
+            start: Function returning a new coroutine to run
+        """
+        while True:
+            try:
+                await start()
+                print(f"{name} stopped, restarting")
+            except Exception as e:
+                print(f"{name} error: {e}, restarting")
+            await asyncio.sleep(1)
+    
     async def _run(self):
         """
         Main entry point to run all ManhaGS tasks.
         
         Initializes the LoRa receiver, creates and schedules the periodic
-        transmission and status reporting tasks, and waits for all tasks to complete.
-        This is designed to run indefinitely until an exception occurs.
+        transmission and web server tasks, and runs the serial console.
+        Each of them is restarted if it fails, so this runs indefinitely.
         """
         
-        # Start the LoRa receiver if initialized
+        # Start the LoRa receiver and heartbeat only if the radio initialized,
+        # without it the heartbeat task would have nothing to send
+        self.heartbeat_task = None
         if self.lora is not None:
             await self.lora.start_receiver()
+            self.heartbeat_task = asyncio.create_task(
+                self._supervise("Heartbeat", self.send_heartbeat))
         
-        # Create and schedule tasks
-        self.heartbeat_task = asyncio.create_task(self.send_heartbeat())
-        self.command_task = asyncio.create_task(self.serial_command_task())        
         # Start the web server
-        self.app_task = asyncio.create_task(self.app.start_server(port=5000))
-        
+        self.app_task = asyncio.create_task(
+            self._supervise("Web server", lambda: self.app.start_server(port=5000)))
         
-        # Wait for all tasks (this will run forever)
-        await asyncio.gather(self.heartbeat_task, self.command_task, self.app_task)
+        # Run the serial console on the main coroutine (this will run forever)
+        await self._supervise("Console", self.serial_command_task)
 
     def add_command(self, command_name: str, callback) -> None:
         """Add a new command to the command registry.
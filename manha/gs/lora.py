@@ -3,18 +3,25 @@ Ground Station LoRa communication module for MANHA project
 """
 
 import time
-import asyncio
 import json
-import gc
+from micropython import const
 from machine import Pin, SPI
 
-from manha.internals.drivers import RFM9x, ModemConfig
 from manha.internals.drivers.rfm9x_constants import *
+from manha.internals.comms.base import LoRaBase
 from manha.internals.comms.packet import Packet
+from manha.utils import calculate_checksum, collect_if_low
 from .constants import *
 
+# Command framing around the command text: CMD:<command>\r\n
+_CMD_HEAD = b"CMD:"
+_CMD_TAIL = b"\r\n"
+# ACK framing around the decimal part number: ACK:<part>\r\n
+_ACK_HEAD = b"ACK:"
+_ACK_MAX_PART = const(999)  # Largest part number built in the reusable ACK buffer
 
-class LoRa:
+
+class LoRa(LoRaBase):
     """
     Ground Station LoRa communication class
     
@@ -26,7 +33,8 @@ class LoRa:
     """
     
     def __init__(self, device_id: int, cs_pin: Pin, spi: SPI, reset_pin: Pin = None,
-                 freq: float = 868.0, tx_power: int = 14, timeout_ms: int = 1000):
+                 freq: float = 868.0, tx_power: int = 14, timeout_ms: int = 1000,
+                 dio0_pin: Pin = None):
         """
         Initialize Ground Station LoRa
         
@@ -38,33 +46,23 @@ class LoRa:
             freq: Frequency in MHz
             tx_power: TX power in dBm (5-23)
             timeout_ms: Operation timeout
+            dio0_pin: Radio DIO0 pin for interrupt-driven reception (optional)
         """
-        self.device_id = device_id
+        super().__init__(device_id, cs_pin, spi, reset_pin, freq, tx_power, timeout_ms, dio0_pin)
         self.satellite_address = device_id  # Set when first packet received
         
-        # Initialize hardware
-        if reset_pin:
-            reset_pin.value(0)
-            time.sleep_ms(100)
-            reset_pin.value(1)
-            time.sleep_ms(100)
-        
-        self._modem = RFM9x(
-            id=device_id,
-            cs=cs_pin,
-            spi=spi,
-            reset=reset_pin,
-            freq=freq,
-            tx_power=tx_power,
-            timeout_ms=timeout_ms
-        )
-        
         # State management
-        self._lock = asyncio.Lock()
-        self._receiver_running = False
-        self._stop_receiver = False
         self._multipart_buffer = {}
+        # Reusable command packet: 3 header bytes, CMD: prefix, command, \r\n
+        self._cmd_buf = bytearray(3 + len(_CMD_HEAD) + CMD_MAX_LEN + len(_CMD_TAIL))
+        self._cmd_buf[3:3 + len(_CMD_HEAD)] = _CMD_HEAD
+        self._cmd_mv = memoryview(self._cmd_buf)
+        # Reusable ACK packet: 3 header bytes, ACK: prefix, up to 3 digits, \r\n
+        self._ack_buf = bytearray(3 + len(_ACK_HEAD) + 3 + len(_CMD_TAIL))
+        self._ack_buf[3:3 + len(_ACK_HEAD)] = _ACK_HEAD
+        self._ack_mv = memoryview(self._ack_buf)
         self._last_telemetry = None
+        self._last_telemetry_json = None
         self._callbacks = {
             CALLBACK_TELEMETRY: None,
             CALLBACK_COMMAND_RESPONSE: None
@@ -85,19 +83,89 @@ class LoRa:
             target_addr = self.satellite_address
         
         try:
-            message = f"CMD:{command}\r\n".encode('utf-8')
-            packet = Packet(target_addr, self.device_id, message)
+            command = command.encode('utf-8')
+            if len(command) > CMD_MAX_LEN:
+                return await self._send_packet(_CMD_HEAD + command + _CMD_TAIL, target_addr)
             
+            # Build in the shared buffer only once the lock is held, so a
+            # queued send cannot overwrite a packet waiting to go out
             async with self._lock:
-                self._modem.set_mode_idle()
-                if self._modem.send(packet.encode()):
-                    return await self._wait_for_tx_complete()
-                return False
+                return await self._transmit(self._build_command(command, target_addr))
                 
         except Exception as e:
             print(f"Command send error: {e}")
             return False
     
+    def _build_command(self, command: bytes, target_addr: int):
+        """
+        Write a command packet into the reusable TX buffer
+        
+        Args:
+            command: Encoded command, at most CMD_MAX_LEN bytes
+            target_addr: Target address
+            
+        Returns:
+            memoryview: The packet, valid until the next build
+        """
+        buf = self._cmd_buf
+        start = 3 + len(_CMD_HEAD)
+        end = start + len(command)
+        buf[start:end] = command
+        buf[end:end + len(_CMD_TAIL)] = _CMD_TAIL
+        end += len(_CMD_TAIL)
+        return self._finish_packet(self._cmd_mv, end, target_addr)
+    
+    def _finish_packet(self, mv, end: int, target_addr: int):
+        """
+        Fill in the address and checksum header of a packet built in place
+        
+        Args:
+            mv: memoryview over the packet buffer, message starting at byte 3
+            end: Length of the packet
+            target_addr: Target address
+            
+        Returns:
+            memoryview: The complete packet
+        """
+        mv[0] = self.device_id
+        mv[1] = target_addr
+        mv[2] = calculate_checksum(mv[3:end])
+        return mv[:end]
+    
+    def encode_command(self, command: str, target_addr: int = None):
+        """
+        Build the encoded packet for a command once, for commands that are resent unchanged
+        
+        Args:
+            command: Command string (e.g., "PING")
+            target_addr: Target address (uses satellite_address if None)
+            
+        Returns:
+            bytearray: Encoded packet to pass to send_encoded()
+        """
+        if target_addr is None:
+            target_addr = self.satellite_address
+        command = command.encode('utf-8')
+        if len(command) > CMD_MAX_LEN:
+            return Packet(target_addr, self.device_id, _CMD_HEAD + command + _CMD_TAIL).encode()
+        return bytes(self._build_command(command, target_addr))
+    
+    async def send_encoded(self, frame) -> bool:
+        """
+        Send a packet built by encode_command()
+        
+        Args:
+            frame: Encoded packet
+            
+        Returns:
+            bool: True if sent successfully
+        """
+        try:
+            return await self._send_encoded(frame)
+        except Exception as e:
+            print(f"Command send error: {e}")
+            return False
+    
     async def send_ack(self, part: int, target_addr: int) -> bool:
         """
         Send ACK packet
@@ -110,87 +178,58 @@ class LoRa:
             bool: True if sent successfully
         """
         try:
-            message = f"ACK:{part}\r\n".encode('utf-8')
-            packet = Packet(target_addr, self.device_id, message)
+            if not 0 <= part <= _ACK_MAX_PART:
+                return await self._send_packet(f"ACK:{part}\r\n".encode('utf-8'), target_addr)
             
+            # Build in the shared buffer only once the lock is held
             async with self._lock:
-                self._modem.set_mode_idle()
-                if self._modem.send(packet.encode()):
-                    return await self._wait_for_tx_complete()
-                return False
+                return await self._transmit(self._build_ack(part, target_addr))
                 
         except Exception as e:
             print(f"ACK send error: {e}")
             return False
     
-    def set_callback(self, callback_type: int, callback_func):
+    def _build_ack(self, part: int, target_addr: int):
         """
-        Set callback for received data
+        Write an ACK packet into the reusable ACK buffer
         
         Args:
-            callback_type: CALLBACK_TELEMETRY or CALLBACK_COMMAND_RESPONSE
-            callback_func: Async function to call
+            part: Part number, 0 to _ACK_MAX_PART
+            target_addr: Target address
+            
+        Returns:
+            memoryview: The packet, valid until the next build
         """
-        if callback_type in self._callbacks:
-            self._callbacks[callback_type] = callback_func
-    
-    async def start_receiver(self):
-        """Start the receiver loop"""
-        if not self._receiver_running:
-            self._stop_receiver = False
-            asyncio.create_task(self._receiver_loop())
-    
-    async def stop_receiver(self):
-        """Stop the receiver loop"""
-        self._stop_receiver = True
-        while self._receiver_running:
-            await asyncio.sleep_ms(10)
-    
-    async def _receiver_loop(self):
-        """Main receiver loop"""
-        self._receiver_running = True
-        
-        while not self._stop_receiver:
-            try:
-                self._modem.set_mode_rx()
-                
-                start_time = time.ticks_ms()
-                while not self._stop_receiver:
-                    if self._modem._is_flag_set(RX_DONE):
-                        # recv_data returns (bytes, rssi, snr)
-                        recv_result = self._modem.recv_data()
-                        if recv_result:
-                            raw_data, rssi, snr = recv_result
-                            await self._process_received_data(raw_data, rssi, snr)
-                        break
-                    
-                    if time.ticks_diff(time.ticks_ms(), start_time) > 1000:
-                        break
-                    
-                    await asyncio.sleep_ms(5)
-                
-                await asyncio.sleep_ms(10)
-                
-            except Exception as e:
-                print(f"Receiver error: {e}")
-                await asyncio.sleep_ms(100)
-        
-        self._receiver_running = False
+        buf = self._ack_buf
+        end = 3 + len(_ACK_HEAD)
+        # Write the part number as ASCII decimal digits, no leading zeros
+        if part >= 100:
+            buf[end] = 0x30 + part // 100
+            end += 1
+        if part >= 10:
+            buf[end] = 0x30 + part // 10 % 10
+            end += 1
+        buf[end] = 0x30 + part % 10
+        end += 1
+        buf[end:end + len(_CMD_TAIL)] = _CMD_TAIL
+        end += len(_CMD_TAIL)
+        return self._finish_packet(self._ack_mv, end, target_addr)
     
     async def _process_received_data(self, raw_data: bytes, rssi: int, snr: float):
         """Process received data"""
         try:
             # Decode packet
-            packet = Packet.decode(raw_data, rssi, snr)
-            if not packet or not packet.is_valid_checksum():
+            packet = Packet.decode(raw_data, rssi, snr, verify=True)
+            if not packet:
                 return
             
             message = packet.message.decode('utf-8').strip()
             
-            # Handle different message types
-            if message.startswith('CMD:'):
-                # Command response - don't ACK
-                await self._handle_command_response(message[4:], packet)
+            # Handle different message types by their prefix
+            head, sep, body = message.partition(':')
+            handler = self._PREFIX_HANDLERS.get(head) if sep else None
+            if handler is not None:
+                await handler(self, body, packet)
             else:
                 # Assume telemetry JSON
                 await self._handle_telemetry(message, packet)
@@ -200,7 +239,7 @@ class LoRa:
     
     async def _handle_command_response(self, response: str, packet: Packet):
         """Handle command response"""
-        print(f"CMDR:{response}")
+        print("CMDR:", response, sep="")
         if self._callbacks[CALLBACK_COMMAND_RESPONSE]:
             try:
                 await self._callbacks[CALLBACK_COMMAND_RESPONSE](response, packet)
@@ -216,7 +255,7 @@ class LoRa:
             # Check if message starts with '{' to determine if it's JSON
             if not message.startswith('{'):
                 # Not JSON - treat as command response
-                print(f"CMDR:{message}")
+                print("CMDR:", message, sep="")
                 if self._callbacks[CALLBACK_COMMAND_RESPONSE]:
                     await self._callbacks[CALLBACK_COMMAND_RESPONSE](message, packet)
                 return
@@ -226,11 +265,11 @@ class LoRa:
             
             # Check if JSON parsing actually worked (MicroPython returns string if invalid)
             if isinstance(data, str) and data == message:
-                print(f"INVALID:{message}")
+                print("INVALID:", message, sep="")
                 return
             
             # Valid telemetry
-            print(f"TLM:{message}")
+            print("TLM:", message, sep="")
             
             # Check for multipart data
             if isinstance(data, dict) and '_part' in data:
@@ -243,6 +282,7 @@ class LoRa:
                 # Single part telemetry
                 await self.send_ack(0, packet.addr_from)
                 self._last_telemetry = data
+                self._last_telemetry_json = message
                 if self._callbacks[CALLBACK_TELEMETRY]:
                     await self._callbacks[CALLBACK_TELEMETRY](data, packet)
                     
@@ -256,34 +296,53 @@ class LoRa:
             total_parts = data.get('_total', 1)
             part_data = data.get('data', '')
             
+            # The slot list is sized from _total, so drop frames that would
+            # make it huge or could not index it at all
+            if (not isinstance(total_parts, int) or not isinstance(part_num, int)
+                    or not 1 <= total_parts <= MULTIPART_MAX_PARTS):
+                print("INVALID:", data, sep="")
+                return None
+            
             # Send ACK for this part
             await self.send_ack(part_num, sender_id)
             
-            # Initialize buffer for this sender
-            if sender_id not in self._multipart_buffer:
-                self._multipart_buffer[sender_id] = {}
+            if not 1 <= part_num <= total_parts:
+                return None
+            
+            now = time.ticks_ms()
+            self._evict_multipart(now, sender_id)
             
-            # Store this part
-            self._multipart_buffer[sender_id][part_num] = part_data
+            # Per sender: a slot per part, how many slots are filled and when
+            # the last part arrived. Start over if the sender has moved on to
+            # a message of another size
+            entry = self._multipart_buffer.get(sender_id)
+            if entry is None or len(entry[0]) != total_parts:
+                entry = [[None] * total_parts, 0, now]
+                self._multipart_buffer[sender_id] = entry
+            entry[2] = now
+            
+            # Store this part, a retransmitted part does not count twice
+            parts = entry[0]
+            if parts[part_num - 1] is None:
+                entry[1] += 1
+            parts[part_num - 1] = part_data
             
             # Check if we have all parts
-            if len(self._multipart_buffer[sender_id]) == total_parts:
-                # Reconstruct complete message
-                complete_data = ''
-                for i in range(1, total_parts + 1):
-                    if i in self._multipart_buffer[sender_id]:
-                        complete_data += self._multipart_buffer[sender_id][i]
+            if entry[1] == total_parts:
+                # Reconstruct complete message in a single allocation
+                complete_data = ''.join(parts)
                 
                 # Clear buffer for this sender
                 del self._multipart_buffer[sender_id]
-                gc.collect()
+                collect_if_low(GC_MIN_FREE)
                 
                 # Parse complete JSON
                 parsed_data = json.loads(complete_data)
                 # Check if JSON parsing worked (MicroPython returns string if invalid)
                 if isinstance(parsed_data, str) and parsed_data == complete_data:
-                    print(f"INVALID:{complete_data}")
+                    print("INVALID:", complete_data, sep="")
                     return None
+                self._last_telemetry_json = complete_data
                 return parsed_data
             
             return None  # Incomplete
@@ -292,29 +351,52 @@ class LoRa:
             print(f"Multipart handling error: {e}")
             return None
     
-    async def _wait_for_tx_complete(self, timeout_ms: int = 2000) -> bool:
-        """Wait for transmission completion"""
-        start_time = time.ticks_ms()
-        while True:
-            irq_flags = self._modem._spi_read(REG_12_IRQ_FLAGS)
-            if irq_flags & TX_DONE:
-                self._modem.clear_irq_flags()
-                self._modem.set_mode_idle()
-                return True
-            
-            if time.ticks_diff(time.ticks_ms(), start_time) > timeout_ms:
-                self._modem.set_mode_idle()
-                return False
-            
-            await asyncio.sleep_ms(10)
+    def _evict_multipart(self, now: int, sender_id: int):
+        """
+        Drop partial multipart messages that can no longer complete
+        
+        Removes senders whose last part is older than MULTIPART_TIMEOUT_MS,
+        then the least recently updated ones while a new sender would push
+        the buffer past MULTIPART_MAX_SENDERS. _handle_multipart only
+        accepts messages of up to MULTIPART_MAX_PARTS parts, each from a
+        single radio frame, so the buffer never holds more than
+        MULTIPART_MAX_SENDERS * MULTIPART_MAX_PARTS frames of data.
+        
+        Args:
+            now: Current time from time.ticks_ms()
+            sender_id: Sender about to store a part
+        """
+        buffer = self._multipart_buffer
+        if not buffer:
+            return
+        
+        evicted = False
+        for sid in [sid for sid, entry in buffer.items()
+                    if time.ticks_diff(now, entry[2]) > MULTIPART_TIMEOUT_MS]:
+            del buffer[sid]
+            evicted = True
+        
+        while sender_id not in buffer and len(buffer) >= MULTIPART_MAX_SENDERS:
+            oldest = None
+            for sid, entry in buffer.items():
+                if oldest is None or time.ticks_diff(entry[2], buffer[oldest][2]) < 0:
+                    oldest = sid
+            del buffer[oldest]
+            evicted = True
+        
+        if evicted:
+            collect_if_low(GC_MIN_FREE)
     
     def get_last_telemetry(self):
         """Get last received telemetry data"""
         return self._last_telemetry
     
-    def set_tx_power(self, tx_power: int):
-        """Set transmission power (5-23 dBm)"""
-        if 5 <= tx_power <= 23:
-            self._modem.set_tx_power(tx_power)
-        else:
-            raise ValueError("tx_power must be between 5 and 23 dBm")
+    def get_last_telemetry_json(self):
+        """Get the JSON text the last telemetry was parsed from"""
+        return self._last_telemetry_json
+    
+    # Message prefixes (text before the first ':') and their handlers,
+    # anything else is treated as telemetry. Command responses are not ACKed
+    _PREFIX_HANDLERS = {
+        "CMD": _handle_command_response,
+    }
@@ -1,17 +1,32 @@
-from . import drivers
-from . import comms
-
 """
 MANHA Internals Package
 
 This package contains internal modules and drivers used by the MANHA platform,
 including hardware drivers and data parsers.
-"""
 
-from .microdot import microdot
-from . import drivers
-from .comms import lora
-from .comms.packet import Packet
+Submodules are imported on first attribute access rather than with the
+package, so `import manha.internals.drivers` on the satkit does not also
+load the web server and the legacy LoRa class.
+"""
 
 __version__ = "1.0.0"
-__all__ = ['drivers', 'microdot', 'lora', 'Packet']
\ No newline at end of file
+__all__ = ['drivers', 'comms', 'microdot', 'lora', 'Packet']
+
+
+def __getattr__(name):
+    if name == 'drivers':
+        from . import drivers
+        return drivers
+    if name == 'comms':
+        from . import comms
+        return comms
+    if name == 'microdot':
+        from .microdot import microdot
+        return microdot
+    if name == 'lora':
+        from .comms import lora
+        return lora
+    if name == 'Packet':
+        from .comms.packet import Packet
+        return Packet
+    raise AttributeError(name)
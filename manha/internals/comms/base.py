@@ -0,0 +1,182 @@
+"""
+Shared LoRa link layer for the MANHA ground station and satkit
+"""
+
+import time
+import asyncio
+from machine import Pin, SPI
+
+from manha.internals.drivers import RFM9x
+from manha.internals.drivers.rfm9x_constants import *
+from manha.internals.comms.packet import Packet
+
+
+class LoRaBase:
+    """
+    Radio plumbing common to the ground station and satellite LoRa classes
+
+    Handles:
+    - RFM9x bring-up
+    - Packet transmission with TX_DONE wait
+    - Background receiver loop
+
+    Subclasses implement `_process_received_data(raw_data, rssi, snr)`
+    and fill `self._callbacks` with the callback types they support.
+    """
+
+    def __init__(self, device_id: int, cs_pin: Pin, spi: SPI, reset_pin: Pin = None,
+                 freq: float = 868.0, tx_power: int = 14, timeout_ms: int = 1000,
+                 dio0_pin: Pin = None):
+        """
+        Initialize the radio
+
+        Args:
+            device_id: Address of this node (0-255)
+            cs_pin: Chip select pin
+            spi: SPI interface
+            reset_pin: Reset pin (optional)
+            freq: Frequency in MHz
+            tx_power: TX power in dBm (5-23)
+            timeout_ms: Operation timeout
+            dio0_pin: Pin wired to the radio's DIO0 line (optional), lets the
+                receiver sleep until a packet arrives instead of polling
+        """
+        self.device_id = device_id
+
+        # Initialize hardware
+        if reset_pin:
+            reset_pin.value(0)
+            time.sleep_ms(100)
+            reset_pin.value(1)
+            time.sleep_ms(100)
+
+        self._modem = RFM9x(
+            id=device_id,
+            cs=cs_pin,
+            spi=spi,
+            reset=reset_pin,
+            freq=freq,
+            tx_power=tx_power,
+            timeout_ms=timeout_ms,
+            dio0=dio0_pin
+        )
+
+        # State management
+        self._lock = asyncio.Lock()
+        self._receiver_running = False
+        self._stop_receiver = False
+        self._callbacks = {}
+
+    async def _send_packet(self, message: bytes, target_addr: int) -> bool:
+        """
+        Send a message and wait for the radio to finish transmitting
+
+        Args:
+            message: Message payload
+            target_addr: Target address
+
+        Returns:
+            bool: True if the packet went out before the TX timeout
+        """
+        return await self._send_encoded(Packet(target_addr, self.device_id, message).encode())
+
+    async def _send_encoded(self, frame) -> bool:
+        """
+        Send an already encoded packet and wait for the radio to finish transmitting
+
+        Args:
+            frame: Encoded packet, as returned by Packet.encode()
+
+        Returns:
+            bool: True if the packet went out before the TX timeout
+        """
+        async with self._lock:
+            return await self._transmit(frame)
+
+    async def _transmit(self, frame) -> bool:
+        """
+        Send an encoded packet, the caller must hold self._lock
+
+        The frame is copied into the radio FIFO before the first await,
+        so a shared scratch buffer may be reused once this returns.
+        """
+        self._modem.set_mode_idle()
+        if self._modem.send(frame):
+            return await self._wait_for_tx_complete()
+        return False
+
+    def set_callback(self, callback_type: int, callback_func):
+        """
+        Set callback for received data
+
+        Args:
+            callback_type: One of the callback types supported by the subclass
+            callback_func: Async function to call
+        """
+        if callback_type in self._callbacks:
+            self._callbacks[callback_type] = callback_func
+
+    async def start_receiver(self):
+        """Start the receiver loop"""
+        if not self._receiver_running:
+            self._stop_receiver = False
+            asyncio.create_task(self._receiver_loop())
+
+    async def stop_receiver(self):
+        """Stop the receiver loop"""
+        self._stop_receiver = True
+        while self._receiver_running:
+            await asyncio.sleep_ms(10)
+
+    async def _receiver_loop(self):
+        """Main receiver loop"""
+        self._receiver_running = True
+
+        # Bind the per-iteration lookups once, this loop runs for the
+        # lifetime of the link
+        modem = self._modem
+        set_mode_rx = modem.set_mode_rx
+        wait_irq = modem.wait_irq
+        receive_pending = self._receive_pending
+        sleep_ms = asyncio.sleep_ms
+
+        while not self._stop_receiver:
+            try:
+                set_mode_rx()
+
+                # Wake within a second either way to notice stop_receiver()
+                if await wait_irq(RX_DONE, 1000):
+                    await receive_pending()
+
+                await sleep_ms(10)
+
+            except Exception as e:
+                print(f"Receiver error: {e}")
+                await sleep_ms(100)
+
+        self._receiver_running = False
+
+    async def _receive_pending(self):
+        """Read the packet waiting in the FIFO and hand it to the subclass"""
+        # recv_data returns (bytes, rssi, snr)
+        recv_result = self._modem.recv_data()
+        if recv_result:
+            raw_data, rssi, snr = recv_result
+            await self._process_received_data(raw_data, rssi, snr)
+
+    async def _wait_for_tx_complete(self, timeout_ms: int = 2000) -> bool:
+        """Wait for transmission completion"""
+        modem = self._modem
+        if await modem.wait_irq(TX_DONE, timeout_ms, 10):
+            modem.clear_irq_flags()
+            modem.set_mode_idle()
+            return True
+        modem.set_mode_idle()
+        return False
+
+    def set_tx_power(self, tx_power: int):
+        """Set transmission power (5-23 dBm)"""
+        if 5 <= tx_power <= 23:
+            self._modem.set_tx_power(tx_power)
+        else:
+            raise ValueError("tx_power must be between 5 and 23 dBm")
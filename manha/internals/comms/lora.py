@@ -10,15 +10,31 @@ sending and receiving data, as well as configuring the LoRa radio parameters.
 """
 
 import time
+import json
 import asyncio
+import binascii
 from collections import namedtuple
 from machine import Pin, SPI
 
-import gc
-
 from manha.internals.drivers import RFM9x, ModemConfig
 from manha.internals.drivers.rfm9x_constants import *
-from manha.utils import calculate_checksum
+from micropython import const
+from manha.utils import calculate_checksum, collect_if_low
+
+# Bound once here, module attribute lookups are a dict lookup per call
+_json_loads = json.loads
+_a2b_base64 = binascii.a2b_base64
+
+# Largest frame the radio takes, REG_22_PAYLOAD_LENGTH is a single byte.
+# Includes the sender, target and checksum header
+_TX_BUF_LEN = const(255)
+
+# Multi-part fragments start with [_FRAGMENT_MAGIC, part, total]. 0xFE never
+# appears in UTF-8 text, so a fragment can't be mistaken for a JSON message
+_FRAGMENT_MAGIC = const(0xFE)
+# Payload bytes per fragment, after the packet and fragment headers:
+# [sender][target][checksum][0xFE][part][total][up to 249 data bytes]
+_FRAGMENT_DATA_LEN = const(_TX_BUF_LEN - 6)
 
 Packet = namedtuple(
     "Packet",
@@ -77,7 +93,8 @@ class LoRa:
                  channel: int = None,
                  freq: float = 868.0,
                  tx_power: int = 14,
-                 timeout_ms: int = 1000):
+                 timeout_ms: int = 1000,
+                 dio0_pin: Pin = None):
         """
         Initialize the LoRa communications interface.
         
@@ -93,6 +110,10 @@ class LoRa:
             channel: Channel within the band
             freq: Frequency in MHz if band/channel not specified
             tx_power: Transmission power in dBm (5-23)
+            timeout_ms: Operation timeout in milliseconds
+            dio0_pin: Pin wired to the radio's DIO0 line (optional), lets
+                reception and TX completion wait on the interrupt instead
+                of polling the IRQ register
         """
         try:
             if reset_pin is not None:
@@ -114,7 +135,8 @@ class LoRa:
                 channel=channel,
                 freq=freq,
                 tx_power=tx_power,
-                timeout_ms=timeout_ms  # Pass timeout to RFM9x driver
+                timeout_ms=timeout_ms,  # Pass timeout to RFM9x driver
+                dio0=dio0_pin
             )
             
             # Device identifier
@@ -137,6 +159,13 @@ class LoRa:
             # Multi-part message handling
             self._multipart_messages = {}
             
+            # IRQ flags from the last completed RX wait, 0 once consumed
+            self._irq_cache = 0
+            
+            # Reusable transmit frame, only touched while holding self._lock
+            self._tx_buf = bytearray(_TX_BUF_LEN)
+            self._tx_mv = memoryview(self._tx_buf)
+            
             print("LoRa initialization complete")
             
         except Exception as e:
@@ -156,8 +185,8 @@ class LoRa:
         Returns:
             bool: True if the transmission was successful
         """
-        # CRITICAL FIX: Run GC before transmission
-        gc.collect()
+        # Make room before transmission only if the heap is actually low
+        collect_if_low()
         try:
             async with self._lock:
                 # Make sure we're in idle mode before sending
@@ -178,78 +207,39 @@ class LoRa:
                 else:
                     payload = bytes(str(data), 'utf-8')
                     
-                # Check if the payload is larger than 255 bytes and needs splitting
-                if len(payload) > 255:
+                # Check if the payload does not fit in one frame and needs splitting
+                if len(payload) > _TX_BUF_LEN - 3:
                     print(f"Large payload detected ({len(payload)} bytes), splitting into batches")
                     
-                    # Calculate midpoint
-                    mid_point = len(payload) // 2
-                    
-                    # Create two batches
-                    batch1 = payload[:mid_point]
-                    batch2 = payload[mid_point:]
-                    
-                    # Use base64 encoding to safely embed binary data in JSON
-                    import binascii
-                    import json
-                    
-                    # Encode batches as base64 to avoid JSON syntax issues
-                    part1_obj = {
-                        "_part": 1, 
-                        "_total": 2,
-                        "data": binascii.b2a_base64(batch1).decode('ascii').strip()
-                    }
-                    part2_obj = {
-                        "_part": 2, 
-                        "_total": 2,
-                        "data": binascii.b2a_base64(batch2).decode('ascii').strip()
-                    }
-                    
-                    batch1 = json.dumps(part1_obj).encode('utf-8')
-                    batch2 = json.dumps(part2_obj).encode('utf-8')
-                    
-                    # Send first batch
-                    checksum1 = calculate_checksum(batch1)
-                    packet1 = bytes([self.device_id, target_id, checksum1]) + batch1
-                    
-                    if not self._modem.send(packet1):
-                        print("CMD:Failed to queue first batch packet")
+                    # Each fragment carries a raw slice of the payload behind a
+                    # [magic, part, total] header, sliced as views so the
+                    # payload is not copied
+                    mv = memoryview(payload)
+                    total_parts = (len(payload) + _FRAGMENT_DATA_LEN - 1) // _FRAGMENT_DATA_LEN
+                    if total_parts > 255:
+                        print(f"Payload too large to send ({len(payload)} bytes)")
                         return False
+                    for part_num in range(1, total_parts + 1):
+                        offset = (part_num - 1) * _FRAGMENT_DATA_LEN
+                        batch = mv[offset:offset + _FRAGMENT_DATA_LEN]
                         
-                    # Wait for first batch TX to complete
-                    success1 = await self._wait_for_tx_complete(2000)
-                    if not success1:
-                        print("First batch transmission failed")
-                        return False
-                    
-                    # Small delay between batches
-                    await asyncio.sleep_ms(100)
-                    
-                    # Send second batch
-                    checksum2 = calculate_checksum(batch2)
-                    packet2 = bytes([self.device_id, target_id, checksum2]) + batch2
-                    
-                    if not self._modem.send(packet2):
-                        print("CMD:Failed to queue second batch packet")
-                        return False
+                        if part_num > 1:
+                            # Small delay between batches
+                            await asyncio.sleep_ms(100)
                         
-                    # Wait for second batch TX to complete
-                    success2 = await self._wait_for_tx_complete(2000)
-                    if not success2:
-                        print("Second batch transmission failed")
-                        return False
+                        if not self._modem.send(self._frame(target_id, batch, part_num, total_parts)):
+                            print(f"CMD:Failed to queue batch packet {part_num}/{total_parts}")
+                            return False
+                        
+                        # Wait for the batch TX to complete
+                        if not await self._wait_for_tx_complete(2000):
+                            print(f"Batch {part_num}/{total_parts} transmission failed")
+                            return False
                         
                     return True
                 
                 # Single packet transmission
-                # Calculate checksum
-                checksum = calculate_checksum(payload)
-                
-                # Create packet: sender_id + target_id + checksum + payload
-                packet = bytes([self.device_id, target_id, checksum]) + payload
-                
-                # Send the packet
-                if not self._modem.send(packet):
+                if not self._modem.send(self._frame(target_id, payload)):
                     print("CMD:Failed to queue packet")
                     return False
                     
@@ -262,6 +252,43 @@ class LoRa:
             self._modem.set_mode_idle()
             return False
     
+    def _frame(self, target_id: int, message, part_num: int = 0, total_parts: int = 0):
+        """
+        Build a packet in the reusable transmit buffer, the caller must hold self._lock.
+        
+        Args:
+            target_id: The target device ID
+            message: The message bytes
+            part_num: Fragment number (1-based) when sending a multi-part message
+            total_parts: Number of fragments in the multi-part message
+            
+        Returns:
+            The packet: sender_id + target_id + checksum + [fragment header] + message
+            
+        Raises:
+            ValueError: If the packet would be longer than the radio accepts
+        """
+        if part_num:
+            head = 6
+        else:
+            head = 3
+        end = head + len(message)
+        if end > _TX_BUF_LEN:
+            raise ValueError(f"Packet too long for the radio ({end} bytes)")
+        
+        buf = self._tx_buf
+        buf[0] = self.device_id
+        buf[1] = target_id
+        if part_num:
+            buf[3] = _FRAGMENT_MAGIC
+            buf[4] = part_num
+            buf[5] = total_parts
+        buf[head:end] = message
+        buf[2] = calculate_checksum(self._tx_mv[3:end])
+        # send() copies the frame into the FIFO, so the buffer is free again
+        # as soon as it returns
+        return self._tx_mv[:end]
+    
     async def recv_async(self, timeout_ms: int = 800) -> bytes:
         """Asynchronously receive data from any sender.
         
@@ -279,26 +306,13 @@ class LoRa:
                 
                 # Put radio in receive mode
                 self._modem.set_mode_rx()
-                                
-                start_time = time.ticks_ms()
-                while True:
-                    # Check for RX_DONE flag directly
-                    if self._modem._is_flag_set(RX_DONE):
-                        raw_data = self._modem.recv_data()
-                        
-                        if raw_data:
-                            # Put radio back to idle mode
-                            self._modem.set_mode_idle()
-                            return raw_data
-                    
-                    # Check for timeout
-                    if time.ticks_diff(time.ticks_ms(), start_time) > timeout_ms:
-                        # Put radio back to idle mode
-                        self._modem.set_mode_idle()
-                        return None
-                        
-                    # Small delay to avoid tight looping
-                    await asyncio.sleep_ms(5)
+                
+                self._irq_cache = await self._modem.wait_irq(RX_DONE, timeout_ms)
+                raw_data = self._read_received() if self._irq_cache else None
+                
+                # Put radio back to idle mode
+                self._modem.set_mode_idle()
+                return raw_data
         except Exception as e:
             print(f"Exception during reception: {e}")
             # Make sure to restore idle mode on exception
@@ -394,54 +408,17 @@ class LoRa:
                 # Set receiving flag
                 self._is_receiving = True
                 
-                # Check for RX_DONE flag directly with a short timeout
-                start_time = time.ticks_ms()
-                while not self._stop_receiver:
-                    if self._modem._is_flag_set(RX_DONE):
-                        raw_data = self._modem.recv_data()
-                        
-                        if raw_data:                            # Process the raw data using the recv_callback
-                            payload = self._packet_preprocessor(raw_data)
-                            
-                            # Process and handle multi-part messages
-                            processed_payload = await self._process_message(payload)
-                            
-                            # Only proceed if we have a complete message (None means incomplete multi-part)
-                            if processed_payload is not None:
-                                # Store the last received payload
-                                self._last_payload = processed_payload
-
-                                # If a callback is set, call it with the processed packet
-                                if self._recv_callback:
-                                    try:
-                                        await self._recv_callback(processed_payload)
-                                    except Exception as e:
-                                        print(f"Error in recv_callback: {e}")
-                            
-                        # Reset receiving flag
-                        self._is_receiving = False
-                        
-                        # Return to idle mode after reception
-                        self._modem.set_mode_idle()
-                        
-                        # Short break before next receive
-                        await asyncio.sleep_ms(10)
-                        break
-                    
-                    # Check for timeout after 1 second
-                    if time.ticks_diff(time.ticks_ms(), start_time) > 1000:
-                        # Reset receiving flag
-                        self._is_receiving = False
-                        
-                        # Return to idle mode after timeout
-                        self._modem.set_mode_idle()
-                        
-                        # Short break before next attempt
-                        await asyncio.sleep_ms(5)
-                        break
-                    
-                    # Small delay to avoid tight looping
-                    await asyncio.sleep_ms(5)
+                # Wake within a second either way to notice stop_receiver()
+                self._irq_cache = await self._modem.wait_irq(RX_DONE, 1000)
+                if self._irq_cache:
+                    await self._receive_pending()
+                
+                # Reset receiving flag and return to idle mode
+                self._is_receiving = False
+                self._modem.set_mode_idle()
+                
+                # Short break before next receive
+                await asyncio.sleep_ms(10)
                     
             except Exception as e:
                 print(f"Error in receiver loop: {e}")
@@ -451,6 +428,45 @@ class LoRa:
         
         self._receiver_running = False
 
+    async def _receive_pending(self) -> None:
+        """Read the packet waiting in the FIFO and pass it to the callback."""
+        raw_data = self._read_received()
+        
+        if raw_data:
+            # Process the raw data using the recv_callback
+            payload = self._packet_preprocessor(raw_data)
+            
+            # Process and handle multi-part messages
+            processed_payload = await self._process_message(payload)
+            
+            # Only proceed if we have a complete message (None means incomplete multi-part)
+            if processed_payload is not None:
+                # Store the last received payload
+                self._last_payload = processed_payload
+
+                # If a callback is set, call it with the processed packet
+                if self._recv_callback:
+                    try:
+                        await self._recv_callback(processed_payload)
+                    except Exception as e:
+                        print(f"Error in recv_callback: {e}")
+
+    def _read_received(self) -> tuple:
+        """
+        Read the packet waiting in the FIFO.
+        
+        When the last RX wait already saw RX_DONE the FIFO is read
+        straight away, instead of recv_data() reading the IRQ register again.
+        
+        Returns:
+            tuple: (bytes, rssi, snr) for the received packet
+        """
+        if self._irq_cache & RX_DONE:
+            # Reading the packet clears the IRQ flags
+            self._irq_cache = 0
+            return self._modem._rx_decode()
+        return self._modem.recv_data()
+
     async def _wait_for_tx_complete(self, timeout_ms: int = 2000) -> bool:
         """
         Helper method to wait for transmission to complete.
@@ -461,22 +477,17 @@ class LoRa:
         Returns:
             bool: True if transmission completed successfully, False if timed out
         """
-        start_time = time.ticks_ms()
-        while True:
-            irq_flags = self._modem._spi_read(REG_12_IRQ_FLAGS)
-            if irq_flags & TX_DONE:
-                self._modem.clear_irq_flags()
-                # Return to idle mode after transmission
-                self._modem.set_mode_idle()
-                return True
-                
-            if time.ticks_diff(time.ticks_ms(), start_time) > timeout_ms:
-                print(f"Transmission timed out after {timeout_ms} ms")
-                # Return to idle mode after timeout
-                self._modem.set_mode_idle()
-                return False
-                
-            await asyncio.sleep_ms(10)
+        modem = self._modem
+        if await modem.wait_irq(TX_DONE, timeout_ms, 10):
+            modem.clear_irq_flags()
+            # Return to idle mode after transmission
+            modem.set_mode_idle()
+            return True
+        
+        print(f"Transmission timed out after {timeout_ms} ms")
+        # Return to idle mode after timeout
+        modem.set_mode_idle()
+        return False
 
     async def _process_message(self, payload):
         """
@@ -488,84 +499,81 @@ class LoRa:
         Returns:
             The processed payload (might be reconstructed from multi-part messages)
         """
+        message = payload.message
+        if len(message) >= 3 and message[0] == _FRAGMENT_MAGIC:
+            # Binary fragment: [magic, part, total] followed by the raw data
+            return self._store_part(payload, message[1], message[2], message[3:])
+        
+        # Older senders wrap base64 fragments in JSON. Only those need parsing
+        # here, anything else is handed on untouched without running it
+        # through the JSON parser
+        if b'"_part"' not in message:
+            return payload
+        
         try:
             # Try to parse JSON message
-            import json
-            data = json.loads(payload.message.decode('utf-8'))
+            data = _json_loads(payload.message.decode('utf-8'))
             
             # Check if this is a multi-part message
             if "_part" in data:
                 part_num = data.get("_part")
                 part_data = data.get("data")
                 total_parts = data.get("_total", 2)  # Default to 2 parts
-                sender_id = payload.sender_id
-                
-                # Create entry for this sender if not exists
-                if sender_id not in self._multipart_messages:
-                    self._multipart_messages[sender_id] = {}
                 
                 # Decode base64 data and store this part
-                import binascii
-                decoded_part = binascii.a2b_base64(part_data.encode('ascii'))
-                self._multipart_messages[sender_id][part_num] = decoded_part
-                
-                # Check if we have all parts
-                if len(self._multipart_messages[sender_id]) == total_parts:
-                    # Reconstruct the complete message by combining parts in order
-                    combined_data = b''
-                    for i in range(1, total_parts + 1):
-                        if i in self._multipart_messages[sender_id]:
-                            combined_data += self._multipart_messages[sender_id][i]
-                    
-                    # Create a new payload with the combined data
-                    from collections import namedtuple
-                    combined_payload = namedtuple(
-                        "Packet",
-                        ['sender_id', 'target_id', 'checksum', 'message', 'rssi', 'snr', 'valid_checksum']
-                    )
-                    
-                    # Clear the stored parts
-                    del self._multipart_messages[sender_id]
-                    
-                    # Create a new payload with the combined message
-                    return combined_payload(
-                        payload.sender_id,
-                        payload.target_id,
-                        payload.checksum,  # Original checksum (not valid for combined message)
-                        combined_data,     # Combined binary data
-                        payload.rssi,
-                        payload.snr,
-                        False  # Checksum is not valid for the combined message
-                    )
-                
-                # We don't have all parts yet, return None to indicate no complete message yet
-                return None
-            
-            # Not a multi-part message, but it is valid JSON
-            # Convert the parsed JSON back to a consistent format
-            import json
-            json_str = json.dumps(data)
-            
-            # Create a new payload with the JSON string as bytes
-            from collections import namedtuple
-            processed_payload = namedtuple(
-                "Packet",
-                ['sender_id', 'target_id', 'checksum', 'message', 'rssi', 'snr', 'valid_checksum']
-            )
+                decoded_part = _a2b_base64(part_data.encode('ascii'))
+                return self._store_part(payload, part_num, total_parts, decoded_part)
             
-            return processed_payload(
-                payload.sender_id,
-                payload.target_id,
-                payload.checksum,
-                json_str.encode('utf-8'),  # Convert JSON back to bytes
-                payload.rssi,
-                payload.snr,
-                payload.valid_checksum
-            )
+            # Not a multi-part message, the original bytes are already valid JSON
+            return payload
             
         except Exception as e:
             print(f"Error processing message: {e}")
             # Not JSON or other error, return original payload
             return payload
 
+    def _store_part(self, payload, part_num: int, total_parts: int, part_data: bytes):
+        """
+        Store one part of a multi-part message.
+        
+        Args:
+            payload: The received payload object the part arrived in
+            part_num: Part number (1-based)
+            total_parts: Number of parts in the message
+            part_data: The decoded data of this part
+            
+        Returns:
+            The reconstructed payload once all parts are in, otherwise None
+        """
+        sender_id = payload.sender_id
+        
+        # Create entry for this sender if not exists
+        if sender_id not in self._multipart_messages:
+            self._multipart_messages[sender_id] = {}
+        
+        parts = self._multipart_messages[sender_id]
+        parts[part_num] = part_data
+        
+        # Check if we have all parts
+        if len(parts) != total_parts:
+            # We don't have all parts yet, return None to indicate no complete message yet
+            return None
+        
+        # Reconstruct the complete message by combining parts in order
+        combined_data = b''.join([parts[i] for i in range(1, total_parts + 1) if i in parts])
+        
+        # Clear the stored parts
+        del self._multipart_messages[sender_id]
+        
+        # Create a new payload with the combined message
+        return Packet(
+            payload.sender_id,
+            payload.target_id,
+            payload.checksum,  # Original checksum (not valid for combined message)
+            combined_data,     # Combined binary data
+            payload.rssi,
+            payload.snr,
+            False  # Checksum is not valid for the combined message
+        )
+
 
@@ -38,19 +38,28 @@ class Packet:
         self.rssi = rssi
         self.snr = snr
     
-    def encode(self) -> bytes:
+    def encode(self) -> bytearray:
         """
         Encode packet to bytes for transmission
         
         Format: [addr_from][addr_to][checksum][message]
         
+        The packet is built in one mutable buffer, so the result is not
+        hashable. Wrap it in bytes() to use it as a dict key.
+        
         Returns:
-            bytes: Encoded packet ready for transmission
+            bytearray: Encoded packet ready for transmission
         """
-        return bytes([self.addr_from, self.addr_to, self.checksum]) + self.message
+        message = self.message
+        buf = bytearray(3 + len(message))
+        buf[0] = self.addr_from
+        buf[1] = self.addr_to
+        buf[2] = self.checksum
+        buf[3:] = message
+        return buf
     
     @classmethod
-    def decode(cls, data: bytes, rssi: int = None, snr: float = None):
+    def decode(cls, data: bytes, rssi: int = None, snr: float = None, verify: bool = False):
         """
         Decode received bytes into a Packet object
         
@@ -58,6 +67,8 @@ class Packet:
             data: Raw received bytes
             rssi: Received Signal Strength Indicator
             snr: Signal to Noise Ratio
+            verify: Check the checksum over the raw buffer first, so a
+                corrupt packet is rejected before any copy is made
             
         Returns:
             Packet: Decoded packet object or None if invalid
@@ -68,6 +79,8 @@ class Packet:
         addr_from = data[0]
         addr_to = data[1] 
         checksum = data[2]
+        if verify and calculate_checksum(memoryview(data)[3:]) != checksum:
+            return None
         message = data[3:] if len(data) > 3 else b''
         
         return cls(addr_to, addr_from, message, checksum, rssi, snr)
@@ -10,7 +10,7 @@ class BatteryVoltage:
         
     @property
     def rawValue(self) -> int:
-        time.sleep(0.1)  # Allow time for ADC to stabilize
+        time.sleep_ms(100)  # Allow time for ADC to stabilize
         _read_val = self.adc_handle.read_u16()
         return _read_val
     
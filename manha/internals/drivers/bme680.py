@@ -36,6 +36,7 @@ MicroPython driver from BME680 air quality sensor, based on Adafruit_bme680
 
 import time
 import math
+import micropython
 from micropython import const
 from binascii import hexlify as hex
 try:
@@ -81,6 +82,7 @@ _LOOKUP_TABLE_2 = (4096000000.0, 2048000000.0, 1024000000.0, 512000000.0, 255744
                    500000.0, 250000.0, 125000.0)
 
 
+@micropython.native
 def _read24(arr):
     """Parse an unsigned 24-bit value as a floating point and return it."""
     ret = 0.0
@@ -100,7 +102,7 @@ class Adafruit_BME680:
         """Check the BME680 was found, read the coefficients and enable the sensor for continuous
            reads."""
         self._write(_BME680_REG_SOFTRESET, [0xB6])
-        time.sleep(0.005)
+        time.sleep_ms(5)
 
         # Check device ID.
         chip_id = self._read_byte(_BME680_REG_CHIPID)
@@ -181,6 +183,7 @@ class Adafruit_BME680:
             raise RuntimeError("Invalid size")
 
     @property
+    @micropython.native
     def temperature(self):
         """The compensated temperature in degrees celsius."""
         self._perform_reading()
@@ -188,6 +191,7 @@ class Adafruit_BME680:
         return calc_temp / 100
 
     @property
+    @micropython.native
     def pressure(self):
         """The barometric pressure in hectoPascals"""
         self._perform_reading()
@@ -211,6 +215,7 @@ class Adafruit_BME680:
         return calc_pres/100
 
     @property
+    @micropython.native
     def humidity(self):
         """The relative humidity in RH %"""
         self._perform_reading()
@@ -255,9 +260,12 @@ class Adafruit_BME680:
     def _perform_reading(self):
         """Perform a single-shot reading from the sensor and fill internal data structure for
            calculations"""
-        expired = time.ticks_diff(self._last_reading, time.ticks_ms()) * time.ticks_diff(0, 1)
-        if 0 <= expired < self._min_refresh_time:
-            time.sleep_ms(self._min_refresh_time - expired)
+        # Reuse the previous measurement while it is still within the refresh
+        # window, so reading temperature, pressure and humidity back to back
+        # costs one single-shot conversion instead of three
+        expired = time.ticks_diff(time.ticks_ms(), self._last_reading)
+        if self._t_fine is not None and 0 <= expired < self._min_refresh_time:
+            return
 
         # set filter
         self._write(_BME680_REG_CONFIG, [self._filter << 2])
@@ -276,7 +284,7 @@ class Adafruit_BME680:
         while not new_data:
             data = self._read(_BME680_REG_MEAS_STATUS, 15)
             new_data = data[0] & 0x80 != 0
-            time.sleep(0.005)
+            time.sleep_ms(5)
         self._last_reading = time.ticks_ms()
 
         self._adc_pres = _read24(data[2:5]) / 16
@@ -1,10 +1,15 @@
 import time
 import math
-from collections import namedtuple
+import asyncio
+import micropython
+from micropython import const
 from machine import SPI, Pin
 
 from .rfm9x_constants import *
 
+# Set to 1 to echo every transmitted payload on the console
+_DEBUG = const(0)
+
 
 class ModemConfig:
     Bw125Cr45Sf128 = (
@@ -34,6 +39,23 @@ class ModemConfig:
     )  # < Bw = 125 kHz, Cr = 4/5, Sf = 2048chips/symbol, CRC on. Slow+long range
 
 
+def _frf_bytes(freq: float) -> bytes:
+    """Split a carrier frequency into the FRF MSB/MID/LSB register values
+
+    Args:
+        freq: frequency in MHz
+
+    Returns:
+        bytes: MSB, MID and LSB register values, in register order
+    """
+    frf = int((freq * 1_000_000.0) / FSTEP)
+    return bytes(((frf >> 16) & 0xFF, (frf >> 8) & 0xFF, frf & 0xFF))
+
+
+# FRF register values for the frequencies the boards are deployed on
+_FRF_TABLE = {f: _frf_bytes(f) for f in (433.0, 868.0, 915.0)}
+
+
 class RFM9x(object):
     def __init__(
         self,
@@ -47,6 +69,7 @@ class RFM9x(object):
         freq: float = 868.0,
         tx_power: int = 14,
         timeout_ms: int = 500,
+        dio0: Pin = None,
     ) -> None:
         """
         Initialize RM95/96/97 radio
@@ -60,6 +83,7 @@ class RFM9x(object):
         tx_power: transmit power in dBm
         modem_config: Check ModemConfig. Default is compatible with the Radiohead library
         timeout_ms: timeout in milliseconds for operations
+        dio0: optional input pin wired to the radio's DIO0 line
         """
 
         # Set ID for the LoRa object
@@ -93,14 +117,31 @@ class RFM9x(object):
         self.cs.value(1)
         self.spi = spi
 
+        # Bound methods used on every register access
+        self._cs_val = cs.value
+        self._spi_w = spi.write
+        self._spi_wr = spi.write_readinto
+
+        # Scratch buffers for register writes (header byte / header + value)
+        self._hdr = bytearray(1)
+        self._reg_buf = bytearray(2)
+
+        # Full-duplex buffers for register reads, sized for a whole FIFO
+        self._txbuf = bytearray(256)
+        self._txmv = memoryview(self._txbuf)
+        self._rxbuf = bytearray(256)
+        self._rxmv = memoryview(self._rxbuf)
+        self._tx2 = self._txmv[:2]
+        self._rx2 = self._rxmv[:2]
+
         version = self._spi_read(REG_42_VERSION)
         print(f"LoRa chip version: {version:#02x}")
 
         self._spi_write(REG_01_OP_MODE, MODE_SLEEP)
-        time.sleep(0.1)
+        time.sleep_ms(100)
 
         self._spi_write(REG_01_OP_MODE, LONG_RANGE_MODE)
-        time.sleep(0.1)
+        time.sleep_ms(100)
 
         # check if mode is set
         lor_r1 = self._spi_read(REG_01_OP_MODE)
@@ -115,24 +156,35 @@ class RFM9x(object):
 
         self.set_mode_idle()
 
-        # set modem config
-        self._spi_write(REG_1D_MODEM_CONFIG1, self._modem_config[0])
-        self._spi_write(REG_1E_MODEM_CONFIG2, self._modem_config[1])
+        # set modem config (MODEM_CONFIG1/2 are adjacent, burst them together)
+        self._spi_write(REG_1D_MODEM_CONFIG1, bytes(self._modem_config[:2]))
         self._spi_write(REG_26_MODEM_CONFIG3, self._modem_config[2])
 
-        # set preamble length (8)
-        self._spi_write(REG_20_PREAMBLE_MSB, 0)
-        self._spi_write(REG_21_PREAMBLE_LSB, 8)
+        # set preamble length (8), MSB then LSB
+        self._spi_write(REG_20_PREAMBLE_MSB, b"\x00\x08")
 
-        # set frequency
-        frf = int((self._freq * 1_000_000.0) / FSTEP)
-        self._spi_write(REG_06_FRF_MSB, (frf >> 16) & 0xFF)
-        self._spi_write(REG_07_FRF_MID, (frf >> 8) & 0xFF)
-        self._spi_write(REG_08_FRF_LSB, frf & 0xFF)
+        # set frequency, FRF MSB/MID/LSB in a single burst
+        self._spi_write(
+            REG_06_FRF_MSB, _FRF_TABLE.get(self._freq) or _frf_bytes(self._freq)
+        )
 
         # Set tx power
         self.set_tx_power(tx_power)
 
+        # Optional: DIO0 signals RxDone in RX mode and TxDone in TX mode
+        # (mapping 00). Only wait_irq() uses it, boards without the line
+        # wired poll the IRQ register instead
+        self._dio0 = dio0
+        self.dio0_flag = None
+        if dio0 is not None:
+            self._spi_write(REG_40_DIO_MAPPING1, 0x00)
+            self.dio0_flag = asyncio.ThreadSafeFlag()
+            dio0.irq(trigger=Pin.IRQ_RISING, handler=self._on_dio0)
+
+    def _on_dio0(self, pin) -> None:
+        """DIO0 rising-edge interrupt handler"""
+        self.dio0_flag.set()
+
     def reset(self):
         """
         Reset the RFM9x radio module
@@ -231,27 +283,27 @@ class RFM9x(object):
         Returns:
             bool: True if data was successfully queued for transmission
         """
-        print(f"CMD:{data}")
+        if _DEBUG:
+            print(f"CMD:{data}")
 
         self.set_mode_idle()
 
-        # Convert data to list of bytes if not already
-        if isinstance(data, bytes):
-            data_bytes = [b for b in data]
+        # Make sure the payload is a single contiguous buffer for the FIFO write
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            payload = data
         elif isinstance(data, list):
-            data_bytes = [int(b) for b in data]
+            payload = bytes(data)
         elif isinstance(data, int):
-            data_bytes = [data]
+            payload = bytes((data,))
         elif isinstance(data, str):
-            data_bytes = [ord(s) for s in data]
+            payload = data.encode()
         else:
             print("Invalid data type")
             return False
-        
 
         self._spi_write(REG_0D_FIFO_ADDR_PTR, 0)
-        self._spi_write(REG_00_FIFO, data_bytes)
-        self._spi_write(REG_22_PAYLOAD_LENGTH, len(data_bytes))
+        self._spi_write(REG_00_FIFO, payload)
+        self._spi_write(REG_22_PAYLOAD_LENGTH, len(payload))
 
         self.set_mode_tx()
         return True
@@ -270,32 +322,42 @@ class RFM9x(object):
         self.set_mode_rx()
 
         while True:
-            irq_flags = self._spi_read(REG_12_IRQ_FLAGS)
-
-            if irq_flags & RX_DONE:
-                packet_len = self._spi_read(REG_13_RX_NB_BYTES)
-                self._spi_write(
-                    REG_0D_FIFO_ADDR_PTR, self._spi_read(REG_10_FIFO_RX_CURRENT_ADDR)
-                )
+            if self._spi_read(REG_12_IRQ_FLAGS) & RX_DONE:
+                return self._rx_decode()
 
-                packet = self._spi_read(REG_00_FIFO, packet_len)
-                self._spi_write(REG_12_IRQ_FLAGS, 0xFF)  # Clear all IRQ flags
+    @micropython.native
+    def _rx_decode(self) -> tuple:
+        """Read the pending packet from the FIFO and compute its link quality
 
-                snr = self._spi_read(REG_19_PKT_SNR_VALUE) / 4
-                rssi = self._spi_read(REG_1A_PKT_RSSI_VALUE)
-
-                if snr < 0:
-                    rssi = snr + rssi
-                else:
-                    rssi = rssi * 16 / 15
+        Returns:
+            tuple: Contains (bytes, rssi, snr) for the packet in the FIFO
+        """
+        # FIFO_RX_CURRENT_ADDR (0x10) through RX_NB_BYTES (0x13) in one burst
+        regs = self._spi_read_buf(REG_10_FIFO_RX_CURRENT_ADDR, 4)
+        fifo_addr = regs[0]
+        packet_len = regs[REG_13_RX_NB_BYTES - REG_10_FIFO_RX_CURRENT_ADDR]
+        self._spi_write(REG_0D_FIFO_ADDR_PTR, fifo_addr)
+
+        packet = bytes(self._spi_read_buf(REG_00_FIFO, packet_len))
+        self._spi_write(REG_12_IRQ_FLAGS, 0xFF)  # Clear all IRQ flags
+
+        # PKT_SNR_VALUE and PKT_RSSI_VALUE are adjacent, read both at once
+        regs = self._spi_read_buf(REG_19_PKT_SNR_VALUE, 2)
+        snr = regs[0] / 4
+        rssi = regs[1]
+
+        if snr < 0:
+            rssi = snr + rssi
+        else:
+            rssi = rssi * 16 / 15
 
-                if self._freq >= 779:
-                    rssi = round(rssi - 157, 2)
-                else:
-                    rssi = round(rssi - 164, 2)
+        if self._freq >= 779:
+            rssi = round(rssi - 157, 2)
+        else:
+            rssi = round(rssi - 164, 2)
 
-                # Return a tuple with raw bytes, rssi, and snr
-                return bytes(packet), rssi, snr
+        # Return a tuple with raw bytes, rssi, and snr
+        return packet, rssi, snr
 
     def _is_flag_set(self, flag: int) -> bool:
         """Check if a specific flag is set in the IRQ register
@@ -322,13 +384,49 @@ class RFM9x(object):
             timeout = self._timeout
 
         start = time.ticks_ms()
-        while not ((irq_flags := self._spi_read(REG_12_IRQ_FLAGS)) & flag):
+        while True:
+            irq_flags = self._spi_read(REG_12_IRQ_FLAGS)
+            if irq_flags & flag:
+                break
             if time.ticks_diff(time.ticks_ms(), start) > timeout:
                 return (False, irq_flags)
             time.sleep_ms(2)
-        self._spi_write(REG_12_IRQ_FLAGS, flag) 
+        self._spi_write(REG_12_IRQ_FLAGS, flag)
         return (True, irq_flags)
 
+    async def wait_irq(self, flag: int, timeout_ms: int, poll_ms: int = 5) -> int:
+        """Wait for a flag in the IRQ register without blocking the event loop
+
+        This is the one place the optional DIO0 line is used. When it is
+        wired the task sleeps on dio0_flag and reads the register once per
+        edge, otherwise the register is polled over SPI every poll_ms.
+
+        Args:
+            flag: Flag bit(s) to wait for
+            timeout_ms: Maximum time to wait (milliseconds)
+            poll_ms: Polling interval when DIO0 is not wired (milliseconds)
+
+        Returns:
+            int: The IRQ flags once one of `flag` is set, 0 on timeout
+        """
+        dio0_flag = self.dio0_flag
+        start = time.ticks_ms()
+        while True:
+            # Read first, DIO0 may have fired before the wait started
+            irq_flags = self._spi_read(REG_12_IRQ_FLAGS)
+            if irq_flags & flag:
+                return irq_flags
+            remaining = timeout_ms - time.ticks_diff(time.ticks_ms(), start)
+            if remaining <= 0:
+                return 0
+            if dio0_flag is None:
+                await asyncio.sleep_ms(poll_ms)
+            else:
+                try:
+                    await asyncio.wait_for_ms(dio0_flag.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
     def wait_tx_done(self, timeout=None) -> int:
         """Wait for the transmission to complete
 
@@ -369,24 +467,32 @@ class RFM9x(object):
         """Clear all IRQ flags"""
         self._spi_write(REG_12_IRQ_FLAGS, 0xFF)
 
+    @micropython.native
     def _spi_write(self, register: int, payload) -> None:
         """Write data to a register over SPI
 
         Args:
             register: Register address to write to
-            payload: Data to write (int, bytes, or string)
+            payload: Data to write (int, or a bytes/bytearray/memoryview buffer)
         """
-        if type(payload) == int:
-            payload = [payload]
-        elif type(payload) == bytes:
-            payload = [p for p in payload]
-        elif type(payload) == str:
-            payload = [ord(s) for s in payload]
-
-        self.cs.value(0)
-        self.spi.write(bytearray([register | 0x80] + payload))
-        self.cs.value(1)
-
+        if isinstance(payload, int):
+            # Single register value: header and value go out in one transfer
+            self._reg_buf[0] = register | 0x80
+            self._reg_buf[1] = payload
+            self._cs_val(0)
+            self._spi_w(self._reg_buf)
+            self._cs_val(1)
+            return
+
+        # Burst write: register header followed by the buffer, CS held low
+        self._hdr[0] = register | 0x80
+        cs = self._cs_val
+        cs(0)
+        self._spi_w(self._hdr)
+        self._spi_w(payload)
+        cs(1)
+
+    @micropython.native
     def _spi_read(self, register: int, length: int = 1):
         """Read data from a register over SPI
 
@@ -395,15 +501,32 @@ class RFM9x(object):
             length: Number of bytes to read (default: 1)
 
         Returns:
-            Data read from the register (int for single byte, bytes for multiple)
+            Data read from the register (int for single byte, memoryview for multiple)
         """
-        self.cs.value(0)
         if length == 1:
-            data = self.spi.read(length + 1, register)[1]
-        else:
-            data = self.spi.read(length + 1, register)[1:]
-        self.cs.value(1)
-        return data
+            self._txbuf[0] = register & 0x7F
+            self._cs_val(0)
+            self._spi_wr(self._tx2, self._rx2)
+            self._cs_val(1)
+            return self._rxbuf[1]
+        return self._spi_read_buf(register, length)
+
+    def _spi_read_buf(self, register: int, length: int) -> memoryview:
+        """Read a block of registers into the shared receive buffer
+
+        Args:
+            register: Register address to read from
+            length: Number of bytes to read
+
+        Returns:
+            memoryview: View over the receive buffer, only valid until the next read
+        """
+        n = length + 1
+        self._txbuf[0] = register & 0x7F
+        self._cs_val(0)
+        self._spi_wr(self._txmv[:n], self._rxmv[:n])
+        self._cs_val(1)
+        return self._rxmv[1:n]
 
     def close(self) -> None:
         """Clean up resources and close the SPI connection"""
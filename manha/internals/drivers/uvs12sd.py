@@ -10,5 +10,5 @@ class UVS12SD:
         
     @property
     def uvValue(self):
-        time.sleep(0.1)
+        time.sleep_ms(100)
         return self._pin.read_u16()
@@ -2,6 +2,11 @@ import machine
 from neopixel import NeoPixel
 import time
 
+try:
+    import rp2
+except ImportError:
+    rp2 = None
+
 MAX_PIXEL_BRIGHTNESS = 5
 MIN_PIXEL_BRIGHTNESS = 0
 
@@ -19,8 +24,52 @@ class PixelColors:
     CLEAR = (0, 0, 0)
 
 
+if rp2 is not None:
+    # WS2812 bit timing in PIO cycles, 10 cycles per bit at 8 MHz = 800 kHz
+    @rp2.asm_pio(
+        sideset_init=rp2.PIO.OUT_LOW,
+        out_shiftdir=rp2.PIO.SHIFT_LEFT,
+        autopull=True,
+        pull_thresh=8,
+    )
+    def _ws2812():
+        T1 = 2
+        T2 = 5
+        T3 = 3
+        wrap_target()
+        label("bitloop")
+        out(x, 1)               .side(0)    [T3 - 1]
+        jmp(not_x, "do_zero")   .side(1)    [T1 - 1]
+        jmp("bitloop")          .side(1)    [T2 - 1]
+        label("do_zero")
+        nop()                   .side(0)    [T2 - 1]
+        wrap()
+
+
+class _PixelBuffer:
+    """GRB pixel buffer with the NeoPixel indexing the PIO path uses"""
+    ORDER = (1, 0, 2)
+    bpp = 3
+
+    def __init__(self, n):
+        self.n = n
+        self.buf = bytearray(n * 3)
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        offset = i * 3
+        for j in range(3):
+            self.buf[offset + self.ORDER[j]] = v[j]
+
+    def __getitem__(self, i):
+        offset = i * 3
+        return tuple(self.buf[offset + self.ORDER[j]] for j in range(3))
+
+
 class WS2812Matrix:
-    def __init__(self, width=8, height=8, do=3, initial_color=None):
+    def __init__(self, width=8, height=8, do=3, initial_color=None, auto_write=True, sm_id=None):
         """Initialize the 8x8 WS2812 LED Matrix
         
         Args:
@@ -28,11 +77,27 @@ class WS2812Matrix:
             height: number of leds in a column
             do: digital out pin
             initial_color: initial color to fill matrix with
+            auto_write: push every change to the LEDs immediately; when False,
+                call show() once after a batch of updates
+            sm_id: PIO state machine to drive the LEDs with on RP2040, the
+                caller picks one no other driver uses. None drives them
+                through NeoPixel instead
         """
         self._width = width
         self._height = height
+        self._auto = auto_write
+        # Colour the whole matrix was last filled with, None once pixels differ
+        self._fill_color = None
 
-        self._neopixel = NeoPixel(machine.Pin(do), width * height)
+        # With a PIO state machine the frame is clocked out by the SM from a
+        # plain GRB buffer, otherwise NeoPixel owns the buffer and the pin
+        self._sm = None
+        if rp2 is not None and sm_id is not None:
+            self._pixels = _PixelBuffer(width * height)
+            self._sm = rp2.StateMachine(sm_id, _ws2812, freq=8_000_000, sideset_base=machine.Pin(do))
+            self._sm.active(1)
+        else:
+            self._pixels = NeoPixel(machine.Pin(do), width * height)
 
         if initial_color is not None:
             self.fill(initial_color)
@@ -45,9 +110,36 @@ class WS2812Matrix:
         """
         if color is None:
             print('Color not provided!')
+        elif color == self._fill_color:
+            # Matrix already shows this colour, skip the WS2812 refresh
+            return
         else:
-            self._neopixel.fill(color)
-            self._neopixel.write()
+            # Set the first pixel (NeoPixel handles channel order), then
+            # double the filled region with C-level slice copies
+            np = self._pixels
+            np[0] = color
+            buf = np.buf
+            n = len(buf)
+            i = np.bpp
+            while i < n:
+                chunk = min(i, n - i)
+                buf[i:i + chunk] = buf[0:chunk]
+                i += chunk
+            self._fill_color = color
+            if self._auto:
+                self._write()
+
+    def _write(self) -> None:
+        """Send the pixel buffer over the WS2812 line"""
+        if self._sm is None:
+            self._pixels.write()
+        else:
+            # One byte per FIFO word, left-aligned for the 8-bit autopull
+            self._sm.put(self._pixels.buf, 24)
+
+    def show(self) -> None:
+        """Push the current pixel buffer to the LEDs"""
+        self._write()
 
     def clear(self) -> None:
         """Set all LEDs in matrix to 'PixelColors.CLEAR'
@@ -56,7 +148,6 @@ class WS2812Matrix:
             color: color to fill matrix with
         """
         self.fill(PixelColors.CLEAR)
-        self._neopixel.write()
 
     def setPixel(self, x, y, color):
         """Set LED at (x,y) in matrix to (0,0,0)
@@ -69,8 +160,10 @@ class WS2812Matrix:
         if color is None:
             print('Color not provided!')
         else:
-            self._neopixel[(8 * y) + x] = color
-            self._neopixel.write()
+            self._pixels[(8 * y) + x] = color
+            self._fill_color = None
+            if self._auto:
+                self._write()
             
     def get(self, x, y) -> tuple:
         """Get LED at (x,y) in matrix as array
@@ -82,7 +175,7 @@ class WS2812Matrix:
         Returns:
             tuple: color of LED at (x,y)
         """
-        return self._neopixel[(8 * y) + x]
+        return self._pixels[(8 * y) + x]
 
     def __setitem__(self, idx, value) -> None:
         """Set individual LED in matrix as array
@@ -91,8 +184,10 @@ class WS2812Matrix:
             idx: index of LED in matrix
             value: color to set LED to
         """
-        self._neopixel[idx] = value
-        self._neopixel.write()
+        self._pixels[idx] = value
+        self._fill_color = None
+        if self._auto:
+            self._write()
 
     def __getitem__(self, idx) -> tuple:
         """Get individual LED in matrix as array
@@ -103,4 +198,4 @@ class WS2812Matrix:
         Returns:
             tuple: color of LED at index idx
         """
-        return self._neopixel[idx]
\ No newline at end of file
+        return self._pixels[idx]
\ No newline at end of file
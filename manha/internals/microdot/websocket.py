@@ -1,9 +1,36 @@
 import binascii
 import hashlib
+import socket
 from .microdot import Request, Response
 from ..microdot.microdot import MUTED_SOCKET_ERRORS, print_exception
 from ..microdot.helpers import wraps
 
+_HANDSHAKE_PREFIX = (b'HTTP/1.1 101 Switching Protocols\r\n'
+                     b'Upgrade: websocket\r\n'
+                     b'Connection: Upgrade\r\n'
+                     b'Sec-WebSocket-Accept: ')
+_HANDSHAKE_SUFFIX = b'\r\n\r\n'
+_WEBSOCKET_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+try:
+    import micropython
+
+    @micropython.viper
+    def _unmask(buf, mask):
+        """XOR a bytearray in place with a 4-byte WebSocket mask."""
+        b = ptr8(buf)  # noqa: F821
+        m = ptr8(mask)  # noqa: F821
+        n = int(len(buf))
+        i = 0
+        while i < n:
+            b[i] = b[i] ^ m[i & 3]
+            i += 1
+except ImportError:  # pragma: no cover
+    def _unmask(buf, mask):
+        """XOR a bytearray in place with a 4-byte WebSocket mask."""
+        for i in range(len(buf)):
+            buf[i] ^= mask[i & 3]
+
 
 class WebSocketError(Exception):
     """Exception raised when an error occurs in a WebSocket connection."""
@@ -35,18 +62,40 @@ class WebSocket:
     #:    WebSocket.max_message_length = 4 * 1024  # up to 4KB messages
     max_message_length = -1
 
+    #: Size of the per-connection buffer used to build outgoing frames.
+    #: Frames that fit (header included) are sent without allocating.
+    tx_buffer_size = 256
+
     def __init__(self, request):
         self.request = request
         self.closed = False
+        # receive buffers for the fixed-size parts of each incoming frame
+        self._header_buf = bytearray(2)
+        self._mask_buf = bytearray(4)
+        # reusable outgoing frame buffer for small messages
+        self._tx_buf = bytearray(self.tx_buffer_size)
+        self._tx_mv = memoryview(self._tx_buf)
 
     async def handshake(self):
         response = self._handshake_response()
         await self.request.sock[1].awrite(
-            b'HTTP/1.1 101 Switching Protocols\r\n')
-        await self.request.sock[1].awrite(b'Upgrade: websocket\r\n')
-        await self.request.sock[1].awrite(b'Connection: Upgrade\r\n')
-        await self.request.sock[1].awrite(
-            b'Sec-WebSocket-Accept: ' + response + b'\r\n\r\n')
+            _HANDSHAKE_PREFIX + response + _HANDSHAKE_SUFFIX)
+        self._set_nodelay()
+
+    def _set_nodelay(self):
+        # websocket frames are small and latency sensitive, so turn off
+        # Nagle's algorithm where the network stack allows it
+        nodelay = getattr(socket, 'TCP_NODELAY', None)
+        if nodelay is None:  # pragma: no cover
+            return
+        stream = self.request.sock[1]
+        sock = getattr(stream, 's', None)  # MicroPython asyncio.Stream
+        if sock is None and hasattr(stream, 'get_extra_info'):
+            sock = stream.get_extra_info('socket')
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, nodelay, 1)
+        except Exception:  # pragma: no cover
+            pass
 
     async def receive(self):
         """Receive a message from the client."""
@@ -66,9 +115,25 @@ class WebSocket:
                        is ``TEXT`` or ``BINARY`` depending on the type of the
                        data.
         """
-        frame = self._encode_websocket_frame(
-            opcode or (self.TEXT if isinstance(data, str) else self.BINARY),
-            data)
+        opcode = opcode or (
+            self.TEXT if isinstance(data, str) else self.BINARY)
+        if isinstance(data, str):
+            data = data.encode()
+        header = self._encode_frame_header(opcode, len(data))
+        hlen = len(header)
+        size = hlen + len(data)
+        if size <= len(self._tx_buf):
+            # small frame: assemble in the pooled buffer, no allocation
+            buf = self._tx_buf
+            buf[:hlen] = header
+            buf[hlen:size] = data
+            frame = self._tx_mv[:size]
+        else:
+            # large frame: one contiguous concatenation of the header that
+            # was already built and the payload
+            frame = header + data
+        # header and payload go out as one buffer; awrite() drains the
+        # stream, so partial socket writes are retried by the stream layer
         await self.request.sock[1].awrite(frame)
 
     async def close(self):
@@ -78,25 +143,19 @@ class WebSocket:
             await self.send(b'', self.CLOSE)
 
     def _handshake_response(self):
-        connection = False
-        upgrade = False
-        websocket_key = None
-        for header, value in self.request.headers.items():
-            h = header.lower()
-            if h == 'connection':
-                connection = True
-                if 'upgrade' not in value.lower():
-                    return self.request.app.abort(400)
-            elif h == 'upgrade':
-                upgrade = True
-                if not value.lower() == 'websocket':
-                    return self.request.app.abort(400)
-            elif h == 'sec-websocket-key':
-                websocket_key = value
+        # headers is a NoCaseDict, so look up the three headers directly
+        # instead of lower-casing every header the client sent
+        headers = self.request.headers
+        connection = headers.get('Connection')
+        upgrade = headers.get('Upgrade')
+        websocket_key = headers.get('Sec-WebSocket-Key')
         if not connection or not upgrade or not websocket_key:
             return self.request.app.abort(400)
+        if 'upgrade' not in connection.lower() or \
+                upgrade.lower() != 'websocket':
+            return self.request.app.abort(400)
         d = hashlib.sha1(websocket_key.encode())
-        d.update(b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11')
+        d.update(_WEBSOCKET_GUID)
         return binascii.b2a_base64(d.digest())[:-1]
 
     @classmethod
@@ -126,27 +185,51 @@ class WebSocket:
             return None, None
         return None, payload
 
+    # most recently built frame header, keyed by (opcode, length); telemetry
+    # frames tend to repeat the same size, so it is usually reusable
+    _header_key = None
+    _header = None
+
+    @classmethod
+    def _encode_frame_header(cls, opcode, length):
+        key = (opcode, length)
+        if key == cls._header_key:
+            return cls._header
+        if length < 126:
+            header = bytes((0x80 | opcode, length))
+        elif length < (1 << 16):
+            header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, 'big')
+        else:
+            header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, 'big')
+        cls._header_key = key
+        cls._header = header
+        return header
+
     @classmethod
     def _encode_websocket_frame(cls, opcode, payload):
-        frame = bytearray()
-        frame.append(0x80 | opcode)
         if opcode == cls.TEXT:
             payload = payload.encode()
-        if len(payload) < 126:
-            frame.append(len(payload))
-        elif len(payload) < (1 << 16):
-            frame.append(126)
-            frame.extend(len(payload).to_bytes(2, 'big'))
-        else:
-            frame.append(127)
-            frame.extend(len(payload).to_bytes(8, 'big'))
-        frame.extend(payload)
-        return frame
+        return cls._encode_frame_header(opcode, len(payload)) + payload
+
+    async def _read_exactly_into(self, buf):
+        stream = self.request.sock[0]
+        if not hasattr(stream, 'readinto'):  # pragma: no cover
+            data = await stream.read(len(buf))
+            if len(data) != len(buf):
+                raise WebSocketError('Websocket connection closed')
+            buf[:] = data
+            return buf
+        mv = memoryview(buf)
+        n = 0
+        while n < len(buf):
+            r = await stream.readinto(mv[n:])
+            if not r:
+                raise WebSocketError('Websocket connection closed')
+            n += r
+        return buf
 
     async def _read_frame(self):
-        header = await self.request.sock[0].read(2)
-        if len(header) != 2:  # pragma: no cover
-            raise WebSocketError('Websocket connection closed')
+        header = await self._read_exactly_into(self._header_buf)
         fin, opcode, has_mask, length = self._parse_frame_header(header)
         if length == -2:
             length = await self.request.sock[0].read(2)
@@ -159,10 +242,12 @@ class WebSocket:
         if length > max_allowed_length:
             raise WebSocketError('Message too large')
         if has_mask:  # pragma: no cover
-            mask = await self.request.sock[0].read(4)
-        payload = await self.request.sock[0].read(length)
-        if has_mask:  # pragma: no cover
-            payload = bytes(x ^ mask[i % 4] for i, x in enumerate(payload))
+            mask = await self._read_exactly_into(self._mask_buf)
+            # read straight into the buffer that gets unmasked in place
+            payload = await self._read_exactly_into(bytearray(length))
+            _unmask(payload, mask)
+        else:
+            payload = await self.request.sock[0].read(length)
         return opcode, payload
 
 
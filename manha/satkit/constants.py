@@ -10,6 +10,8 @@ LORA_SPI_MISO = const(8)
 LORA_SPI_MOSI = const(11)
 LORA_SPI_CS = const(9)
 
+MEM_CHECK_INTERVAL_MS = const(1000)  # Reuse the last heap pressure reading for this long
+
 # Callback type constants
 CALLBACK_TELEMETRY_REQUEST = const(0)
 CALLBACK_COMMAND = const(1)
\ No newline at end of file
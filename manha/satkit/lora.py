@@ -9,13 +9,14 @@ import gc
 import os
 from machine import Pin, SPI, reset
 
-from manha.internals.drivers import RFM9x, ModemConfig
+from manha.internals.drivers import PixelColors
 from manha.internals.drivers.rfm9x_constants import *
+from manha.internals.comms.base import LoRaBase
 from manha.internals.comms.packet import Packet
 from .constants import *
 
 
-class LoRa:
+class LoRa(LoRaBase):
     """
     Satellite LoRa communication class
     
@@ -27,7 +28,8 @@ class LoRa:
     """
     
     def __init__(self, device_id: int, cs_pin: Pin, spi: SPI, reset_pin: Pin = None,
-                 freq: float = 868.0, tx_power: int = 14, timeout_ms: int = 1000, led_matrix=None):
+                 freq: float = 868.0, tx_power: int = 14, timeout_ms: int = 1000, led_matrix=None,
+                 dio0_pin: Pin = None):
         """
         Initialize Satellite LoRa
         
@@ -40,32 +42,13 @@ class LoRa:
             tx_power: TX power in dBm (5-23)
             timeout_ms: Operation timeout
             led_matrix: LED matrix instance for visual indicators
+            dio0_pin: Radio DIO0 pin for interrupt-driven reception (optional)
         """
-        self.device_id = device_id
+        super().__init__(device_id, cs_pin, spi, reset_pin, freq, tx_power, timeout_ms, dio0_pin)
         self.ground_station_address = device_id
         self.led_matrix = led_matrix  # LED matrix for visual feedback
         
-        # Initialize hardware
-        if reset_pin:
-            reset_pin.value(0)
-            time.sleep_ms(100)
-            reset_pin.value(1)
-            time.sleep_ms(100)
-        
-        self._modem = RFM9x(
-            id=device_id,
-            cs=cs_pin,
-            spi=spi,
-            reset=reset_pin,
-            freq=freq,
-            tx_power=tx_power,
-            timeout_ms=timeout_ms
-        )
-        
         # State management
-        self._lock = asyncio.Lock()
-        self._receiver_running = False
-        self._stop_receiver = False
         self._last_ack_time = time.ticks_ms()
         self._beacon_mode = False
         self._beacon_interval = 10000  # 10s default, adjustable based on power/priority
@@ -230,8 +213,8 @@ class LoRa:
                 recv_result = self._modem.recv_data()
                 if recv_result:
                     raw_data, rssi, snr = recv_result
-                    packet = Packet.decode(raw_data, rssi, snr)
-                    if packet and packet.is_valid_checksum():
+                    packet = Packet.decode(raw_data, rssi, snr, verify=True)
+                    if packet:
                         # Update last communication time
                         self._last_ack_time = time.ticks_ms()
                         
@@ -262,13 +245,7 @@ class LoRa:
         """Send command response"""
         try:
             message = f"CMD:{response}\r\n".encode('utf-8')
-            packet = Packet(target_addr, self.device_id, message)
-            
-            async with self._lock:
-                self._modem.set_mode_idle()
-                if self._modem.send(packet.encode()):
-                    return await self._wait_for_tx_complete()
-                return False
+            return await self._send_packet(message, target_addr)
                 
         except Exception as e:
             print(f"Command response error: {e}")
@@ -279,60 +256,11 @@ class LoRa:
         """Add custom command handler"""
         self._command_handlers[command] = handler
     
-    def set_callback(self, callback_type: int, callback_func):
-        """Set callback function"""
-        if callback_type in self._callbacks:
-            self._callbacks[callback_type] = callback_func
-    
-    async def start_receiver(self):
-        """Start receiver task"""
-        if not self._receiver_running:
-            self._stop_receiver = False
-            asyncio.create_task(self._receiver_loop())
-    
-    async def stop_receiver(self):
-        """Stop receiver"""
-        self._stop_receiver = True
-        while self._receiver_running:
-            await asyncio.sleep_ms(10)
-    
-    async def _receiver_loop(self):
-        """Main receiver loop"""
-        self._receiver_running = True
-        
-        while not self._stop_receiver:
-            try:
-                self._modem.set_mode_rx()
-                
-                start_time = time.ticks_ms()
-                while not self._stop_receiver:
-                    if self._modem._is_flag_set(RX_DONE):
-                        # recv_data returns (bytes, rssi, snr)
-                        recv_result = self._modem.recv_data()
-                        if recv_result:
-                            raw_data, rssi, snr = recv_result
-                            await self._process_received_data(raw_data, rssi, snr)
-                        break
-                    
-                    if time.ticks_diff(time.ticks_ms(), start_time) > 1000:
-                        break
-                    
-                    await asyncio.sleep_ms(5)
-                
-                await asyncio.sleep_ms(10)
-                
-            except Exception as e:
-                print(f"Receiver error: {e}")
-                await asyncio.sleep_ms(100)
-        
-        self._receiver_running = False
-    
-    
     async def _process_received_data(self, raw_data: bytes, rssi: int, snr: float):
         """Process received command data"""
         try:
-            packet = Packet.decode(raw_data, rssi, snr)
-            if not packet or not packet.is_valid_checksum():
+            packet = Packet.decode(raw_data, rssi, snr, verify=True)
+            if not packet:
                 return
             
             message = packet.message.decode('utf-8').strip()
@@ -382,39 +310,14 @@ class LoRa:
             print(f"Reset handling error: {e}")
             await self._flash_led_error()
     
-    async def _wait_for_tx_complete(self, timeout_ms: int = 2000) -> bool:
-        """Wait for transmission completion"""
-        start_time = time.ticks_ms()
-        while True:
-            irq_flags = self._modem._spi_read(REG_12_IRQ_FLAGS)
-            if irq_flags & TX_DONE:
-                self._modem.clear_irq_flags()
-                self._modem.set_mode_idle()
-                return True
-            
-            if time.ticks_diff(time.ticks_ms(), start_time) > timeout_ms:
-                self._modem.set_mode_idle()
-                return False
-            
-            await asyncio.sleep_ms(10)
-    
     def set_beacon_interval(self, interval_ms: int):
         """Set beacon interval based on power mode/priority"""
         self._beacon_interval = interval_ms
     
-    def set_tx_power(self, tx_power: int):
-        """Set transmission power (5-23 dBm)"""
-        if 5 <= tx_power <= 23:
-            self._modem.set_tx_power(tx_power)
-        else:
-            raise ValueError("tx_power must be between 5 and 23 dBm")
-    
     async def _flash_led_ack_error(self):
         """Flash LED matrix MAGENTA for ACK failures"""
         if self.led_matrix:
             try:
-                # Import here to avoid circular imports
-                from manha.satkit.peripherals import PixelColors
                 self.led_matrix.fill(PixelColors.MAGENTA)
                 await asyncio.sleep_ms(200)
                 self.led_matrix.clear()
@@ -425,8 +328,6 @@ class LoRa:
         """Flash LED matrix RED for general LoRa errors"""
         if self.led_matrix:
             try:
-                # Import here to avoid circular imports
-                from manha.satkit.peripherals import PixelColors
                 self.led_matrix.fill(PixelColors.RED)
                 await asyncio.sleep_ms(200)
                 self.led_matrix.clear()
@@ -5,20 +5,24 @@ import asyncio
 import time
 import gc
 import json
-
-from collections import namedtuple
+from micropython import const
 
 from manha.utils import calculate_checksum
 
 # Import all needed modules upfront
 from manha.satkit.peripherals import LEDMatrix, PixelColors
 from manha.internals.drivers import GPSParser, NeoGPS, ADXL345, BME680_I2C, INA219, UVS12SD
+from manha.internals.comms.packet import Packet
 from .lora import LoRa
 from . import i2c
 
 from manha.config import *
 from .constants import *
 
+# Command packets from the GS are b"CMD:<command>"
+_CMD_PREFIX = b"CMD:"
+_CMD_PREFIX_LEN = const(4)
+
 
 class MANHA:
     @property
@@ -72,6 +76,10 @@ class MANHA:
         self._packet_count = 0
         self._tlm_generator = None
         
+        # Last heap pressure reading and when it was taken
+        self._mem_critical = False
+        self._mem_checked_at = time.ticks_add(time.ticks_ms(), -MEM_CHECK_INTERVAL_MS)
+        
         # Pre-allocated buffers for memory optimization
         self._temp_dict = {}  # Reusable dict for telemetry
         
@@ -93,7 +101,7 @@ class MANHA:
             print("WARNING: Low memory before LoRa init")
             gc.collect()
         
-        spi = machine.SPI(LORA_SPI_CHANNEL, baudrate=5_000_000, polarity=0, phase=0,
+        spi = machine.SPI(LORA_SPI_CHANNEL, baudrate=10_000_000, polarity=0, phase=0, firstbit=machine.SPI.MSB,
                   sck=machine.Pin(LORA_SPI_SCK), mosi=machine.Pin(LORA_SPI_MOSI), miso=machine.Pin(LORA_SPI_MISO))
         cs_pin = machine.Pin(LORA_SPI_CS, machine.Pin.OUT)
         gc.collect()
@@ -252,10 +260,11 @@ class MANHA:
                 try:
                     if not hasattr(self, '_bme680'):
                         self._bme680 = BME680_I2C(i2c=i2c.m_i2c, address=0x77)
+                    # Round to sensor resolution so the JSON floats stay short
                     return {
-                        'temp': self._bme680.temperature,
-                        'pres': self._bme680.pressure,
-                        'hum': self._bme680.humidity
+                        'temp': round(self._bme680.temperature, 2),
+                        'pres': round(self._bme680.pressure, 2),
+                        'hum': round(self._bme680.humidity, 2)
                     }
                 except:
                     return {'temp': -1, 'pres': -1, 'hum': -1}
@@ -315,28 +324,29 @@ class MANHA:
     
     async def _listen_for_commands(self, listen_time_ms: int):
         """Listen for incoming commands for specified time - using bytes comparisons"""
-        self.lora._modem.set_mode_rx()
+        modem = self.lora._modem
+        modem.set_mode_rx()
         start_time = time.ticks_ms()
         
         while time.ticks_diff(time.ticks_ms(), start_time) < listen_time_ms:
             # Check for RX_DONE
-            if self.lora._modem._is_flag_set(0x40):  # RX_DONE
-                recv_result = self.lora._modem.recv_data()
+            if modem._is_flag_set(0x40):  # RX_DONE
+                recv_result = modem.recv_data()
                 if recv_result:
                     raw_data, rssi, snr = recv_result
-                    from manha.internals.comms.packet import Packet
-                    packet = Packet.decode(raw_data, rssi, snr)
-                    if packet and packet.is_valid_checksum():
+                    packet = Packet.decode(raw_data, rssi, snr, verify=True)
+                    if packet:
                         # Use bytes comparison instead of string
-                        if packet.message.startswith(b'CMD:'):
-                            command_bytes = packet.message[4:].strip()
-                            await self._process_command_bytes(command_bytes, packet.addr_from)
+                        message = packet.message
+                        if message.startswith(_CMD_PREFIX):
+                            # Hand on a view past the prefix, only the decoded command is allocated
+                            await self._process_command_bytes(memoryview(message)[_CMD_PREFIX_LEN:], packet.addr_from)
                         # Return early if we received something
                         return
             
             await asyncio.sleep_ms(10)
     
-    async def _process_command_bytes(self, command_bytes: bytes, sender_addr: int):
+    async def _process_command_bytes(self, command_bytes, sender_addr: int):
         """Process command using bytes - set flag for generator to handle response"""
         try:
             # Visual indication of command reception
@@ -345,7 +355,7 @@ class MANHA:
             self.led_matrix.clear()
             
             # Convert bytes to string for processing
-            command = command_bytes.decode('utf-8')
+            command = str(command_bytes, 'utf-8').strip()
             
             # Process standard commands first
             if command == "PING":
@@ -369,10 +379,12 @@ class MANHA:
     async def _handle_custom_command_with_response(self, command: str, sender_addr: int) -> str:
         """Handle custom commands and return response string"""
         try:
-            if command.startswith("TXPOW="):
+            # Split NAME=<value> once instead of testing each prefix in turn
+            name, _, value = command.partition('=')
+            
+            if name == "TXPOW":
                 # Extract power value from TXPOW=<v> format
-                power_str = command.split('=')[1]
-                power = int(power_str)
+                power = int(value)
                 
                 if 5 <= power <= 23:
                     self.lora.set_tx_power(power)
@@ -380,10 +392,9 @@ class MANHA:
                 else:
                     return "TX power must be between 5 and 23dBm"
                     
-            elif command.startswith("LPM="):
+            elif name == "LPM":
                 # Extract LPM value from LPM=<0/1> format
-                lpm_str = command.split('=')[1]
-                lmp_value = int(lpm_str)
+                lmp_value = int(value)
                 
                 if lmp_value == 1:
                     if not self.low_power_mode:
@@ -417,7 +428,6 @@ class MANHA:
         """Send command response using direct modem access"""
         try:
             message = f"CMD:{response}\r\n".encode('utf-8')
-            from manha.internals.comms.packet import Packet
             packet = Packet(target_addr, self.lora_address_self, message)
             
             self.lora._modem.set_mode_idle()
@@ -453,13 +463,24 @@ class MANHA:
         await self.blink_led_matrix(PixelColors.MAGENTA)  # Indicate normal mode
         
     def _check_memory_pressure(self) -> bool:
-        """Check if memory pressure is high and return True if we should skip operations"""
+        """Check if memory pressure is high and return True if we should skip operations
+        
+        gc.mem_free() walks the whole heap and this is called several times
+        per telemetry cycle, so a reading is reused for MEM_CHECK_INTERVAL_MS.
+        """
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._mem_checked_at) < MEM_CHECK_INTERVAL_MS:
+            return self._mem_critical
+        self._mem_checked_at = now
+        
         free_mem = gc.mem_free()
         if free_mem < 50000:  # Less than 50KB free
             print(f"Memory pressure: {free_mem} bytes free")
             gc.collect()  # Force collection
-            return free_mem < 30000  # Critical if still less than 30KB
-        return False
+            self._mem_critical = free_mem < 30000  # Critical if still less than 30KB
+        else:
+            self._mem_critical = False
+        return self._mem_critical
     
     async def read_sensors_task(self, interval: int=1):
         """Task to read sensors sequentially with memory optimization
@@ -514,11 +535,11 @@ class MANHA:
                             temp_telemetry.update(data)
                             data = None  # Clear reference immediately
                         
-                        # Garbage collect after each sensor
-                        gc.collect()
-                        
                     except Exception:
                         print(f"Sensor error: essential {i}")  # Minimal string allocation
+                    
+                    # Let the LoRa task service TX/ACK between sensor reads
+                    await asyncio.sleep_ms(0)
                 
                 # Read non-essential sensors if not in low power mode
                 if not self.low_power_mode:
@@ -540,11 +561,10 @@ class MANHA:
                                 temp_telemetry.update(data)
                                 data = None  # Clear reference immediately
                             
-                            # Garbage collect after each sensor
-                            gc.collect()
-                            
                         except Exception:
                             print(f"Sensor error: non-essential {i}")  # Minimal string allocation
+                        
+                        await asyncio.sleep_ms(0)
                 
                 # Update global telemetry dict with lock
                 if temp_telemetry:  # Only update if we have data
@@ -584,19 +604,22 @@ class MANHA:
                 yield b'{"err":"mem"}'
                 return
             
-            # Split into parts
-            keys = list(self._temp_dict.keys())
+            # Split into parts, tracking each part's JSON size incrementally:
+            # '{}' plus every '"key": value' item and the ', ' between items
             current_part = {}
+            part_len = 2
             
-            for key in keys:
+            for key, value in self._temp_dict.items():
                 if self._check_memory_pressure():
                     break
-                current_part[key] = self._temp_dict[key]
-                test_json = json.dumps(current_part)
-                if len(test_json) > 200 and len(current_part) > 1:
-                    current_part.pop(key)
+                item_len = len(json.dumps({key: value})) - 2
+                new_len = part_len + item_len + (2 if current_part else 0)
+                if new_len > 200 and current_part:
                     yield json.dumps(current_part).encode('utf-8')
-                    current_part = {key: self._temp_dict[key]}
+                    current_part = {}
+                    new_len = 2 + item_len
+                current_part[key] = value
+                part_len = new_len
             
             if current_part:
                 yield json.dumps(current_part).encode('utf-8')
@@ -652,6 +675,8 @@ class MANHA:
     async def lora_tlm_task(self, interval=3):
         """Memory-optimized LoRa telemetry task using generator function"""
         last_telemetry_time = time.ticks_ms()
+        interval_ms = interval * 1000
+        modem = self.lora._modem
         
         while True:
             try:
@@ -668,7 +693,7 @@ class MANHA:
                 time_since_last_tlm = time.ticks_diff(current_time, last_telemetry_time)
                 
                 # Check if it's time to send telemetry or we have a command to send
-                if time_since_last_tlm >= (interval * 1000) or self.command_flag:
+                if time_since_last_tlm >= interval_ms or self.command_flag:
                     target_addr = self.lora_address_to
                     ack_received = False
                     
@@ -678,12 +703,11 @@ class MANHA:
                     if tlm_bytes and len(tlm_bytes) > 2:  # More than just '{}'
                         try:
                             # Create packet with memory check
-                            from manha.internals.comms.packet import Packet
                             packet = Packet(target_addr, self.lora_address_self, tlm_bytes)
                             
                             # Send packet using direct modem access
-                            self.lora._modem.set_mode_idle()
-                            if self.lora._modem.send(packet.encode()):
+                            modem.set_mode_idle()
+                            if modem.send(packet.encode()):
                                 # Wait for TX_DONE
                                 if await self._wait_tx_done():
                                     # Wait for ACK
@@ -727,11 +751,12 @@ class MANHA:
     
     async def _wait_tx_done(self, timeout_ms=2000):
         """Wait for TX_DONE flag"""
+        modem = self.lora._modem
         start_time = time.ticks_ms()
         while True:
-            irq_flags = self.lora._modem._spi_read(0x12)  # REG_12_IRQ_FLAGS
+            irq_flags = modem._spi_read(0x12)  # REG_12_IRQ_FLAGS
             if irq_flags & 0x08:  # TX_DONE
-                self.lora._modem.clear_irq_flags()
+                modem.clear_irq_flags()
                 return True
             if time.ticks_diff(time.ticks_ms(), start_time) > timeout_ms:
                 return False
@@ -740,20 +765,21 @@ class MANHA:
     
     async def _wait_for_simple_ack(self, timeout_ms: int) -> bool:
         """Wait for ACK with minimal memory usage"""
-        self.lora._modem.set_mode_rx()
+        modem = self.lora._modem
+        modem.set_mode_rx()
         start_time = time.ticks_ms()
         
         while time.ticks_diff(time.ticks_ms(), start_time) < timeout_ms:
-            if self.lora._modem._is_flag_set(0x40):  # RX_DONE
-                recv_result = self.lora._modem.recv_data()
+            if modem._is_flag_set(0x40):  # RX_DONE
+                recv_result = modem.recv_data()
                 if recv_result:
-                    raw_data, _, _ = recv_result
-                    # Quick check for ACK without full packet decode
-                    if len(raw_data) >= 6 and raw_data[3:6] == b'ACK':
-                        return True
+                    raw_data = recv_result[0]
+                    # Quick check for ACK without full packet decode,
                     # CMD also counts as ACK
-                    elif len(raw_data) >= 6 and raw_data[3:6] == b'CMD':
-                        return True
+                    if len(raw_data) >= 6:
+                        kind = raw_data[3:6]
+                        if kind == b'ACK' or kind == b'CMD':
+                            return True
             await asyncio.sleep_ms(20)
         
         return False
@@ -769,6 +795,18 @@ class MANHA:
         except Exception as e:
             print(f"Error during shutdown: {e}")
 
+    async def _run(self):
+        """Run the sensor and telemetry tasks concurrently until one fails"""
+        # Slower sensor reading and telemetry rate to reduce memory usage
+        self.sensor_task = asyncio.create_task(self.read_sensors_task(3))
+        self.lora_task = asyncio.create_task(self.lora_tlm_task(5))
+        
+        await asyncio.gather(self.sensor_task, self.lora_task)
+
+    def shutdown(self):
+        """Shutdown MANHA gracefully"""
+        asyncio.run(self._shutdown())
+
     def run(self):
         # Aggressive memory cleanup before starting
         gc.collect()
@@ -779,15 +817,11 @@ class MANHA:
         if initial_memory < 40000:
             print("WARNING: Low memory at startup - expect issues")
         
-        # Create tasks with staggered timing to reduce concurrent memory usage
-        sensor_task = asyncio.create_task(self.read_sensors_task(3))  # Slower sensor reading
-        lora_task = asyncio.create_task(self.lora_tlm_task(5))  # Slower telemetry rate
-        
         try:
-            asyncio.run(asyncio.gather(sensor_task, lora_task))
+            asyncio.run(self._run())
         except MemoryError:
             print("CRITICAL: Memory allocation failed in main tasks")
-            self._shutdown()
+            self.shutdown()
         except Exception as e:
             print(f"Main task error: {e}")
-            self._shutdown()
\ No newline at end of file
+            self.shutdown()
\ No newline at end of file
@@ -11,16 +11,20 @@ class LEDMatrix:
     _DEFAULT_HEIGHT = const(8)
     _DEFAULT_COLOR = PixelColors.CLEAR
     _DEFAULT_DO = const(3)
+    _DEFAULT_SM_ID = const(0)  # PIO0 SM0, no other satkit driver uses PIO
     
-    def __init__(self, width: int = _DEFAULT_WIDTH, height: int = _DEFAULT_HEIGHT, do: int = _DEFAULT_DO) -> None:
+    def __init__(self, width: int = _DEFAULT_WIDTH, height: int = _DEFAULT_HEIGHT, do: int = _DEFAULT_DO,
+                 sm_id: int = _DEFAULT_SM_ID) -> None:
         """Initialize the LED matrix with specified width, height, and brightness.
 
         Args:
             width (int): Width of the LED matrix.
             height (int): Height of the LED matrix.
             brightness (int): Brightness level of the LEDs (0-255).
+            sm_id (int): PIO state machine driving the LEDs, None to use NeoPixel.
         """
-        self._matrix = WS2812Matrix(width=width, height=height, do=do, initial_color=self._DEFAULT_COLOR)
+        self._matrix = WS2812Matrix(width=width, height=height, do=do, initial_color=self._DEFAULT_COLOR,
+                                    sm_id=sm_id)
         
     def set_pixel(self, x: int, y: int, color: tuple) -> None:
         """Set the color of a specific pixel in the matrix.
@@ -52,6 +56,10 @@ class LEDMatrix:
         """
         self._matrix.fill(color)
         
+    def show(self) -> None:
+        """Push pending pixel changes to the LEDs."""
+        self._matrix.show()
+
     def clear(self) -> None:
         """Clear the matrix by setting all pixels to black (off)."""
         self._matrix.clear()
@@ -64,11 +72,9 @@ class LEDMatrix:
             delay (int): Delay in milliseconds between blinks.
         """
         self.fill(color)
-        self._matrix.write()
         time.sleep_ms(delay)
         if off_color is None:
             self.clear()
         else:
             self.fill(off_color)
-        self._matrix.write()
         time.sleep_ms(delay)
\ No newline at end of file
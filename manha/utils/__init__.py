@@ -6,24 +6,73 @@
 Helper functions for the Manha project.
 """
 
+import gc
 
-def calculate_checksum(data: bytes) -> int:
+
+try:
+    import micropython
+
+    @micropython.viper
+    def calculate_checksum(data) -> int:
+        """
+        Calculate a simple checksum for the given data.
+        
+        Compiled with the viper emitter, so the byte loop runs as machine
+        code instead of through the bytecode VM.
+        
+        Args:
+            data: Buffer to calculate checksum for (bytes, bytearray or memoryview)
+            
+        Returns:
+            int: The calculated checksum (0-255)
+        """
+        # Simple sum of bytes modulo 256
+        p = ptr8(data)  # noqa: F821
+        n = int(len(data))
+        checksum = 0
+        i = 0
+        while i < n:
+            checksum = (checksum + p[i]) & 0xFF
+            i += 1
+        return checksum
+except ImportError:  # pragma: no cover
+    def calculate_checksum(data: bytes) -> int:
+        """
+        Calculate a simple checksum for the given data.
+        
+        Args:
+            data: The bytes data to calculate checksum for
+            
+        Returns:
+            int: The calculated checksum (0-255)
+        """
+        # Simple sum of bytes modulo 256
+        checksum = 0
+        for byte in data:
+            checksum = (checksum + byte) % 256
+        return checksum
+
+
+def collect_if_low(min_free: int = 8192) -> bool:
     """
-    Calculate a simple checksum for the given data.
+    Run a garbage collection only when the free heap is running low.
+    
+    Collections scan the whole heap, so hot paths call this instead of
+    gc.collect() and leave routine collection to the allocator.
     
     Args:
-        data: The bytes data to calculate checksum for
+        min_free: Collect when fewer than this many bytes are free
         
     Returns:
-        int: The calculated checksum (0-255)
+        bool: True if a collection was run
     """
-    # Simple sum of bytes modulo 256
-    checksum = 0
-    for byte in data:
-        checksum = (checksum + byte) % 256
-    return checksum
+    if gc.mem_free() < min_free:
+        gc.collect()
+        return True
+    return False
 
 
 __all__ = [
     "calculate_checksum",
+    "collect_if_low",
 ]
\ No newline at end of file
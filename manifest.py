@@ -0,0 +1,20 @@
+# MicroPython frozen manifest for the MANHA OBC and GS
+#
+# Freezes the manha package and the compass driver into the firmware image
+# so their bytecode runs from flash instead of being compiled into RAM on boot.
+#
+# Build from the MicroPython rp2 port, for the satkit and the GS respectively:
+#   make BOARD=RPI_PICO FROZEN_MANIFEST=/path/to/tm2_manha_firmware/manifest.py
+#   make BOARD=RPI_PICO_W FROZEN_MANIFEST=/path/to/tm2_manha_firmware/manifest.py
+#
+# Modules are compiled at optimisation level 3, which drops docstrings,
+# asserts and line-number info, the same as `mpy-cross -O3`.
+
+# Keep the port's default frozen modules (asyncio, neopixel, ...). Every rp2
+# board has this one, unlike a board manifest, which RPI_PICO lacks. The
+# Pico W's WLAN driver and `network` module are built in, not frozen, so the
+# GS still has them
+include("$(PORT_DIR)/boards/manifest.py")
+
+package("manha", opt=3)
+module("qmc5883.py", opt=3)
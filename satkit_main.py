@@ -2,7 +2,7 @@ from manha.satkit.peripherals import ManhaSensor
 from manha.satkit import MANHA
 
 from qmc5883 import QMC5883
-from machine import Pin, SoftI2C
+import machine
 
 import asyncio as aio
 import time